@@ -2,9 +2,18 @@ import hashlib
 import json
 import uuid
 import ast
+from math import ceil
 
 import pendulum
-from flask import Blueprint, current_app, jsonify, request, redirect
+from flask import (
+    Blueprint,
+    current_app,
+    jsonify,
+    redirect,
+    request,
+    Response,
+    stream_with_context,
+)
 from flask_mail import Message
 from marshmallow import ValidationError
 from werkzeug.utils import secure_filename
@@ -12,22 +21,32 @@ from werkzeug.utils import secure_filename
 from app import db, mail
 from models import *  # noqa: F403 | I did this as all models and schemas will be used in this file
 from utils.auth import login_required, login_user, logout_user, verify_auth
+from utils.cache import conditional_response, response_cache
+from utils.pool import pool_metrics
 from utils.cdn import (
-    delete_blog_images,
+    ImageTooLargeError,
+    blog_image_ids,
     delete_image,
     get_file_extension,
     patch_blog_images,
     patch_image,
+    release_images,
     upload_blog_images,
     upload_image,
 )
 
+from utils.links import inspect_links, link_jobs
+from utils.query import execute_select, explain_select, stream_select
 from utils.sql import (
-    execute_select,
+    blog_counter,
+    bump_row_count,
     get_total_blog_posts,
     get_total_project_pages,
-    inspect_links,
+    get_skill_facets,
+    get_total_project_posts,
+    keyset_paginate,
     paginate_project_posts,
+    search_posts,
     show_blog_posts,
 )
 from utils.bool import to_bool
@@ -127,17 +146,75 @@ def admin_logout():
 def admin_link_inspector():
     """
     Endpoint to inspect all links across all tables in the database.
-    It inspects the links
+    It inspects the links concurrently
     using the database engine and returns the results in JSON format.
+    Link statuses checked recently are served from the link status cache
+    unless the "refresh" query argument is true.
     Returns:
         Response: A JSON response containing the inspection results.
     """
-    links = inspect_links(db.engine)
+    refresh = request.args.get("refresh", False, to_bool)
+
+    links = inspect_links(
+        db.engine,
+        max_workers=current_app.config["LINK_INSPECTOR_WORKERS"],
+        timeout=current_app.config["LINK_INSPECTOR_TIMEOUT"],
+        deadline=current_app.config["LINK_INSPECTOR_DEADLINE"],
+        ttl=0 if refresh else current_app.config["LINK_INSPECTOR_CACHE_TTL"],
+    )
     report = links if len(links) != 0 else "No links found."
 
     return jsonify({"report": report})
 
 
+@api.post("/admin/links")
+@login_required
+def admin_start_link_inspection():
+    """
+    Endpoint to start inspecting all links across all tables in the background.
+
+    If an inspection is already running, that inspection is returned instead of starting a new crawl.
+    Its progress and partial results can be polled from /admin/links/jobs/<job_id>.
+    Link statuses checked recently are served from the link status cache
+    unless the "refresh" query argument is true.
+
+    Returns:
+        Response: A JSON response containing the inspection job with a 202 status code.
+    """
+    refresh = request.args.get("refresh", False, to_bool)
+
+    job = link_jobs.start(
+        db.engine,
+        max_workers=current_app.config["LINK_INSPECTOR_WORKERS"],
+        timeout=current_app.config["LINK_INSPECTOR_TIMEOUT"],
+        deadline=current_app.config["LINK_INSPECTOR_DEADLINE"],
+        ttl=0 if refresh else current_app.config["LINK_INSPECTOR_CACHE_TTL"],
+    )
+
+    return jsonify({"job": job.to_dict()}), 202
+
+
+@api.get("/admin/links/jobs/<job_id>")
+@login_required
+def admin_link_inspection_job(job_id):
+    """
+    Endpoint to poll a link inspection job.
+
+    Passing "latest" as the job id returns the most recent inspection, so reloading the
+    dashboard shows the last results without triggering a new crawl.
+
+    Returns:
+        Response: A JSON response containing the job progress and the link reports finished so far.
+        404: If the job does not exist.
+    """
+    job = link_jobs.latest() if job_id == "latest" else link_jobs.get(job_id)
+
+    if job is None:
+        return jsonify({"error": "No link inspection job was found"}), 404
+
+    return jsonify({"job": job.to_dict()})
+
+
 @api.post("/admin/sql")
 @login_required
 def admin_execute_sql():
@@ -145,18 +222,26 @@ def admin_execute_sql():
     Endpoint to execute SQL queries for administrator.
 
     This endpoint allows the administrator to execute SQL queries by sending a POST request
-    with the query in the request body.
+    with the query in the request body. Queries run as a single statement inside a
+    READ ONLY transaction with a statement timeout, so JOINs, subqueries and CTEs
+    are supported but writes are rejected by the database.
 
     Returns:
         JSON response containing the result of the SQL query or an error message.
 
     Request Body:
         {
-            "query": "SQL query string"
+            "query": "SQL query string (a single read-only statement)",
+            "explain": "(optional) return the EXPLAIN (ANALYZE, BUFFERS) plan of the query instead of its rows",
+            "stream": "(optional) stream the rows as newline delimited JSON",
+            "limit": "(optional) maximum amount of rows to return",
+            "cursor_key": "(optional) column used for keyset paging (defaults to id when after is sent)",
+            "after": "(optional) only return rows whose cursor_key is greater than this value"
         }
 
     Responses:
-        200: A JSON object containing the result of the SQL query.
+        200: A JSON object containing the result of the SQL query (and the next cursor when paging),
+             the query plan when explaining, or one JSON object per line when streaming.
         400: A JSON object with an error message if no data was provided.
         Other: A JSON object with an error message and the corresponding status code if the query execution fails.
     """
@@ -165,13 +250,68 @@ def admin_execute_sql():
     if not data:
         return jsonify({"error": "No data was provided!"}), 400
 
-    query_res, query_ok = execute_select(data["query"], db.engine)
+    if data.get("explain"):
+        plan, query_ok = explain_select(
+            data["query"],
+            db.engine,
+            timeout=current_app.config["ADMIN_SQL_STATEMENT_TIMEOUT"],
+        )
+
+        if query_ok != 200:
+            return jsonify({"err_msg": plan}), query_ok
+        return jsonify({"plan": plan})
+
+    limit = data.get("limit")
+    after = data.get("after")
+    cursor_key = data.get("cursor_key", "id" if after is not None else None)
+
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    options = {
+        "limit": limit,
+        "cursor_key": cursor_key,
+        "after": after,
+        "timeout": current_app.config["ADMIN_SQL_STATEMENT_TIMEOUT"],
+    }
+
+    if data.get("stream"):
+        rows, query_ok = stream_select(
+            data["query"],
+            db.engine,
+            batch_size=current_app.config["ADMIN_SQL_STREAM_BATCH_SIZE"],
+            **options,
+        )
+
+        if query_ok != 200:
+            return jsonify({"err_msg": rows}), query_ok
+
+        ndjson = (current_app.json.dumps(row) + "\n" for row in rows)
+        return Response(stream_with_context(ndjson), mimetype="application/x-ndjson")
+
+    query_res, query_ok = execute_select(data["query"], db.engine, **options)
 
     if query_ok != 200:
         return jsonify({"err_msg": query_res}), query_ok
+
+    if cursor_key is not None and limit is not None and len(query_res) == limit:
+        return jsonify({"res": query_res, "next_cursor": query_res[-1][cursor_key]})
     return jsonify({"res": query_res})
 
 
+@api.get("/admin/metrics/pool")
+@login_required
+def admin_pool_metrics():
+    """
+    Endpoint to inspect the database connection pool.
+
+    Returns:
+        JSON response containing the pool checkout, wait and connection counters
+        alongside the current size of the pool.
+    """
+    return jsonify({"pool": pool_metrics.snapshot(db.engine.pool)})
+
+
 @api.post("/education/courses")
 def get_courses():
     """
@@ -187,9 +327,7 @@ def get_courses():
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
-    courses = db.session.execute(
-        db.select(Course).filter_by(associated_institute=data["institute"])
-    ).scalars()
+    courses = db.session.execute(Course.by_institute(data["institute"])).scalars()
 
     return schema.dump(courses)
 
@@ -317,6 +455,8 @@ def delete_course():
 
 
 @api.get("/education/institute")
+@conditional_response
+@response_cache.cached("education")
 def get_institutes():
     """
     Api endpoint for returning all educational institutes
@@ -328,12 +468,6 @@ def get_institutes():
 
     institutes = db.session.query(Education).all()
 
-    for institute in institutes:
-        if institute.awards != "N/A":
-            awards = institute.awards
-            awards = awards.split("|")
-            institute.awards = awards
-
     return schema.dump(institutes)
 
 
@@ -366,10 +500,6 @@ def institute_add():
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 403
 
-    parsed_start_date = pendulum.from_format(
-        serialized_data["start_date"], "MM/YYYY"
-    ).format("MMMM Y")
-
     (
         grad_date,
         expected_date,
@@ -389,15 +519,21 @@ def institute_add():
         serialized_data["expected_date"] = parsed_end_date
         serialized_data.pop("grad_date")
 
-    serialized_data["start_date"] = parsed_start_date
-
     if serialized_data["major"] == "":
         serialized_data.pop("major")
 
     # create image file
     file_ext = get_file_extension(img_file.mimetype)
     img_name = secure_filename(f"image_{uuid.uuid4().hex}.{file_ext}")
-    img_url, img_id = upload_image(img_file, img_name)
+    try:
+        res = upload_image(img_file, img_name)
+    except ImageTooLargeError as err:
+        return jsonify({"error": str(err)}), 413
+
+    if not res:
+        return jsonify({"error": "The logo could not be uploaded to the CDN"}), 502
+
+    img_url, img_id = res
 
     serialized_data["logo_url"] = img_url
     serialized_data["logo_id"] = img_id
@@ -406,6 +542,7 @@ def institute_add():
 
     db.session.add(entry)
     db.session.commit()
+    response_cache.invalidate("education")
 
     return jsonify(
         {
@@ -451,7 +588,7 @@ def edit_institute():
 
     for field in fields:
         match field:
-            case "start_date" | "grad_date" | "expected_date":
+            case "grad_date" | "expected_date":
                 parsed_date = pendulum.from_format(
                     serialized_data[field], "MM/YYYY"
                 ).format("MMMM Y")
@@ -460,13 +597,25 @@ def edit_institute():
             case "logo_url":
                 file_ext = get_file_extension(img_file.mimetype)
                 img_name = secure_filename(f"image_{uuid.uuid4().hex}.{file_ext}")
-                new_url, new_id = patch_image(img_file, img_name, institute.logo_id)
+                try:
+                    res = patch_image(img_file, img_name, institute.logo_id)
+                except ImageTooLargeError as err:
+                    return jsonify({"error": str(err)}), 413
+
+                if not res:
+                    return (
+                        jsonify({"error": "The logo could not be uploaded to the CDN"}),
+                        502,
+                    )
+
+                new_url, new_id = res
                 setattr(institute, field, new_url)
                 institute.logo_id = new_id
             case _:
                 setattr(institute, field, serialized_data[field])
 
     db.session.commit()
+    response_cache.invalidate("education")
     return jsonify({"success": f"{institute.name} was successfully edited!"})
 
 
@@ -499,11 +648,14 @@ def delete_institute():
 
     db.session.delete(institute)
     db.session.commit()
+    response_cache.invalidate("education")
 
     return jsonify({"success": f"{name} has been deleted!"})
 
 
 @api.get("/experience")
+@conditional_response
+@response_cache.cached("experience")
 def get_experience():
     """
     API endpoint to get all work experiences sorted from oldest to most recent.
@@ -513,9 +665,7 @@ def get_experience():
     schema = ExperiencePostSchema(many=True)
 
     # Get and Sort all work experiences from oldest to most recent
-    work_experiences = db.session.execute(
-        db.select(ExperiencePost).order_by(ExperiencePost.start_date.desc())
-    ).scalars()
+    work_experiences = db.session.execute(ExperiencePost.newest_first()).scalars()
 
     return schema.dump(work_experiences)
 
@@ -542,22 +692,17 @@ def add_experience():
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 403
 
-    parsed_start_date = pendulum.from_format(
-        serialized_data["start_date"], "MM/YYYY"
-    ).format("MMMM Y")
-
     end_date = serialized_data.get("end_date")
 
     if end_date:
         parsed_end_date = pendulum.from_format(end_date, "MM/YYYY").format("MMMM Y")
         serialized_data["end_date"] = parsed_end_date
 
-    serialized_data["start_date"] = parsed_start_date
-
     work_experience = ExperiencePost(**serialized_data)
 
     db.session.add(work_experience)
     db.session.commit()
+    response_cache.invalidate("experience")
 
     return jsonify({"success": f'{serialized_data["name"]} was successfully added'})
 
@@ -587,7 +732,7 @@ def edit_experience():
 
     for field in schema.only:
         match field:
-            case "start_date" | "end_date":
+            case "end_date":
                 parsed_date = pendulum.from_format(
                     serialized_data[field], "MM/YYYY"
                 ).format("MMMM Y")
@@ -597,6 +742,7 @@ def edit_experience():
                 setattr(work_experience, field, serialized_data[field])
 
     db.session.commit()
+    response_cache.invalidate("experience")
     return jsonify({"success": f"{work_experience.name} was successfully edited!"})
 
 
@@ -622,11 +768,14 @@ def delete_experience():
 
     db.session.delete(work_experience)
     db.session.commit()
+    response_cache.invalidate("experience")
 
     return jsonify({"success": f"{name} was successfully deleted!"})
 
 
 @api.get("/cert")
+@conditional_response
+@response_cache.cached("cert")
 def get_cert():
     """
     Get and return a list of work certificates and licenses sorted from oldest to most recent.
@@ -638,7 +787,9 @@ def get_cert():
 
     # Get and Sort all work cert/license from oldest to most recent
     certlicenses = db.session.execute(
-        db.select(CertandLicense).order_by(CertandLicense.issue_date.desc())
+        db.select(CertandLicense).order_by(
+            CertandLicense.issue_date.desc(), CertandLicense.id.desc()
+        )
     ).scalars()
 
     return schema.dump(certlicenses)
@@ -669,10 +820,6 @@ def add_cert():
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 403
 
-    parsed_issue_date = pendulum.from_format(
-        serialized_data["issue_date"], "MM/YYYY"
-    ).format("MMMM Y")
-
     issue_exp = serialized_data.get("issue_exp")
 
     if issue_exp:
@@ -681,12 +828,11 @@ def add_cert():
         ).format("MMMM Y")
         serialized_data["issue_exp"] = parsed_exp_date
 
-    serialized_data["issue_date"] = parsed_issue_date
-
     cert = CertandLicense(**serialized_data)
 
     db.session.add(cert)
     db.session.commit()
+    response_cache.invalidate("cert")
 
     return jsonify({"success": f"{cert.name} was successfully added!"})
 
@@ -718,7 +864,7 @@ def edit_cert():
 
     for field in schema.only:
         match field:
-            case "issue_data" | "issue_exp":
+            case "issue_exp":
                 parsed_date = pendulum.from_format(
                     serialized_data[field], "MM/YYYY"
                 ).format("MMMM Y")
@@ -728,6 +874,7 @@ def edit_cert():
                 setattr(cert, field, serialized_data[field])
 
     db.session.commit()
+    response_cache.invalidate("cert")
     return jsonify({"success": f"{cert.name} has been successfully edited!"})
 
 
@@ -753,11 +900,14 @@ def delete_cert():
 
     db.session.delete(cert)
     db.session.commit()
+    response_cache.invalidate("cert")
 
     return jsonify({"success": f"{name} was successfully deleted!"})
 
 
 @api.get("/showcase")
+@conditional_response
+@response_cache.cached("showcase")
 def get_showcase():
     """
     This API endpoint retrieves the showcase data from the database.
@@ -781,7 +931,7 @@ def add_showcase():
         return jsonify({"error": "No data was provided!"}), 400
 
     project = db.session.execute(
-        db.select(ProjectPost).filter_by(name=data["project_name"])
+        ProjectPost.by_name(data["project_name"])
     ).scalar_one_or_none()
 
     if project is None:
@@ -795,30 +945,98 @@ def add_showcase():
     showcase.project_posts.append(project)
 
     db.session.commit()
+    response_cache.invalidate("showcase")
 
     return jsonify({"success": f"{project.name} was successfully added to Showcase"})
 
 
 @api.get("/projects")
+@conditional_response
+@response_cache.cached("projects")
 def get_projects():
     """
     This API endpoint retrieves a paginated list of projects from the database and returns the serialized data.
+
+    Projects are paginated with keyset (cursor) pagination ordered by id. The response contains the
+    projects of the page, the cursors of the next and previous pages and the total amount of projects,
+    so no separate /projects/totalpages request is needed.
+    Passing the legacy "page" argument instead returns the plain list of projects of that page.
+
     Parameters:
-        None
+        cursor: (optional) cursor of the page boundary returned by a previous response
+        direction: (optional) "next" (default) or "prev"
+        size: (optional) amount of projects per page
+        skill: (optional, repeatable) only list projects having every given skill (not supported with "page")
+        page: (legacy) page number to retrieve
     Returns:
         A JSON response containing the paginated list of projects.
     Raises:
-        None
+        400: If the page size, direction or cursor is invalid.
     """
     current_page = request.args.get("page", type=int)
+    page_size = request.args.get(
+        "size", current_app.config["PROJECTS_PAGE_SIZE"], type=int
+    )
     schema = ProjectPostSchema(many=True)
 
-    if not current_page:
-        return jsonify({"error": "No page data was provided!"}), 400
+    if not 0 < page_size <= current_app.config["PROJECTS_MAX_PAGE_SIZE"]:
+        return jsonify({"error": "Invalid page size!"}), 400
 
-    projects = paginate_project_posts(ProjectPost, db.engine, current_page)
+    if current_page:
+        projects = paginate_project_posts(
+            ProjectPost, db.engine, current_page, page_size
+        )
+
+        return schema.dump(projects)
+
+    skills = [Skill.slugify(skill) for skill in request.args.getlist("skill")]
+    stmt = ProjectPost.with_skills(skills)
+
+    try:
+        projects, next_cursor, prev_cursor = keyset_paginate(
+            db.engine,
+            stmt,
+            PROJECT_LIST_KEYS,
+            cursor=request.args.get("cursor"),
+            direction=request.args.get("direction", "next"),
+            page_size=page_size,
+        )
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    if skills:
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(stmt.subquery())
+        ).scalar()
+    else:
+        total = get_total_project_posts(db.engine)
+
+    return jsonify(
+        {
+            "projects": schema.dump(projects),
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+            "total": total,
+            "total_pages": ceil(total / page_size),
+        }
+    )
+
+
+@api.get("/projects/skills")
+@conditional_response
+@response_cache.cached("projects")
+def get_project_skills():
+    """
+    This API endpoint retrieves the skill facets of the projects.
+
+    Parameters:
+        skill: (optional, repeatable) only count the projects having every given skill
+    Returns:
+        A JSON response containing the name, slug and project count of every skill, most used first.
+    """
+    skills = [Skill.slugify(skill) for skill in request.args.getlist("skill")]
 
-    return schema.dump(projects)
+    return jsonify({"skills": get_skill_facets(db.engine, skills)})
 
 
 @api.get("/projects/totalpages")
@@ -828,7 +1046,9 @@ def get_project_totalpages():
     Returns:
         dict: A dictionary containing the total number of pages for projects.
     """
-    total_pages = get_total_project_pages(db.engine)
+    total_pages = get_total_project_pages(
+        db.engine, current_app.config["PROJECTS_PAGE_SIZE"]
+    )
 
     return jsonify({"payload": total_pages})
 
@@ -852,22 +1072,19 @@ def add_project():
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 403
 
-    parsed_start_date = pendulum.from_format(
-        serialized_data["start_date"], "MM/YYYY"
-    ).format("MMMM Y")
-
     end_date = serialized_data.get("end_date")
 
     if end_date:
         parsed_end_date = pendulum.from_format(end_date, "MM/YYYY").format("MMMM Y")
         serialized_data["end_date"] = parsed_end_date
 
-    serialized_data["start_date"] = parsed_start_date
-
     project = ProjectPost(**serialized_data)
+    project.sync_skills()
 
     db.session.add(project)
+    bump_row_count(db.session, "project_post", 1)
     db.session.commit()
+    response_cache.invalidate("projects")
 
     return jsonify({"success": f"{serialized_data['name']} was successfully added!"})
 
@@ -890,7 +1107,7 @@ def edit_projects():
 
     for field in schema.only:
         match field:
-            case "start_date" | "end_date":
+            case "end_date":
                 parsed_field = pendulum.from_format(
                     serialized_data[field], "MM/YYYY"
                 ).format("MMMM Y")
@@ -899,7 +1116,11 @@ def edit_projects():
             case _:
                 setattr(project, field, serialized_data[field])
 
+    if "skills" in schema.only:
+        project.sync_skills()
+
     db.session.commit()
+    response_cache.invalidate("projects", "showcase")
     return jsonify({"success": f"{project.name} has been successfully updated!"})
 
 
@@ -925,29 +1146,79 @@ def delete_project():
         showcase.remove_project(project)
 
     db.session.delete(project)
+    bump_row_count(db.session, "project_post", -1)
     db.session.commit()
+    response_cache.invalidate("projects", "showcase")
 
     return jsonify({"success": f"{project.name} has been successfully deleted"})
 
 
 @api.get("/blog")
+@conditional_response
 def get_blogs():
+    """
+    This API endpoint retrieves a page of published blog posts, newest first.
+
+    Blog posts are paginated with keyset (cursor) pagination and only the listing columns
+    (id, title, desc and created_at) are loaded, the content is only sent by /blog/singular.
+    Passing the legacy "tp" argument instead returns the first `tp` published blog posts.
+
+    Parameters:
+        cursor: (optional) cursor of the page boundary returned by a previous response
+        direction: (optional) "next" (default) or "prev"
+        size: (optional) amount of blog posts per page
+        tp: (legacy) amount of blog posts to retrieve
+    Returns:
+        A JSON response containing the blog posts of the page and the total amount of published blog posts.
+    Raises:
+        204: If no blog posts exist.
+        400: If the page size, direction or cursor is invalid.
+    """
     total_pages = request.args.get("tp", type=int)
+    page_size = request.args.get("size", current_app.config["BLOG_PAGE_SIZE"], type=int)
     total_blogs = get_total_blog_posts(db.engine)
-    schema = BlogPostSchema(many=True)
+    schema = BlogPostSchema(many=True, only=BLOG_LIST_FIELDS)
 
-    if not total_pages:
+    if "tp" in request.args and not total_pages:
         return jsonify({"error": "No data was provided!"}), 400
 
+    if not 0 < page_size <= current_app.config["BLOG_MAX_PAGE_SIZE"]:
+        return jsonify({"error": "Invalid page size!"}), 400
+
     if total_blogs == 0:
         return jsonify({"bypass": "No blogs exists currently."}), 204
 
-    blog_posts = show_blog_posts(BlogPost, db.engine, total_pages)
+    if total_pages:
+        blog_posts = show_blog_posts(BlogPost, db.engine, total_pages, BLOG_LIST_FIELDS)
+
+        return jsonify({"blogs": schema.dump(blog_posts), "blog_count": total_blogs})
+
+    try:
+        blog_posts, next_cursor, prev_cursor = keyset_paginate(
+            db.engine,
+            BlogPost.listing(),
+            BLOG_LIST_KEYS,
+            cursor=request.args.get("cursor"),
+            direction=request.args.get("direction", "next"),
+            page_size=page_size,
+            descending=True,
+        )
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
 
-    return jsonify({"blogs": schema.dump(blog_posts), "blog_count": total_blogs})
+    return jsonify(
+        {
+            "blogs": schema.dump(blog_posts),
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+            "blog_count": total_blogs,
+        }
+    )
 
 
 @api.get("/blog/singular")
+@conditional_response
+@response_cache.cached("blog", scope_arg="id")
 def get_blog():
     blog_id = request.args.get("id", type=int)
     editing = request.args.get("edit", type=to_bool)
@@ -956,9 +1227,10 @@ def get_blog():
         return jsonify({"error": "No id was provided"}), 400
 
     if editing:
-        schema = BlogPostSchema()
+        schema = BlogPostSchema(exclude=("content_html", "excerpt"))
     else:
-        schema = BlogPostSchema(exclude=("desc",))
+        # readers get the pre-rendered html instead of the editor tree
+        schema = BlogPostSchema(exclude=("desc", "content"))
 
     blog_post = db.session.execute(db.select(BlogPost).filter_by(id=blog_id)).scalar()
 
@@ -978,11 +1250,7 @@ def get_blog_drafts():
         ),
     )
 
-    blogs = db.session.execute(
-        db.select(BlogPost)
-        .filter_by(is_draft=True)
-        .order_by(BlogPost.created_at.desc())
-    ).scalars()
+    blogs = db.session.execute(BlogPost.drafts()).scalars()
 
     if not blogs:
         return "", 204
@@ -1011,18 +1279,44 @@ def add_blog():
         "is_draft": to_bool(is_draft),
     }
 
-    content = upload_blog_images(data["content"])
-    data["content"] = json.dumps(content)
-
     try:
         serialized_data = schema.load(data)
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 403
 
+    serialized_data["content"], failures = upload_blog_images(
+        serialized_data["content"],
+        max_workers=current_app.config["BLOG_IMAGE_UPLOAD_WORKERS"],
+        timeout=current_app.config["BLOG_IMAGE_DOWNLOAD_TIMEOUT"],
+        deadline=current_app.config["BLOG_IMAGE_UPLOAD_DEADLINE"],
+    )
+
+    if failures:
+        return (
+            jsonify(
+                {
+                    "error": "Some blog images could not be uploaded to the CDN",
+                    "failures": failures,
+                }
+            ),
+            502,
+        )
+
     blog = BlogPost(**serialized_data)
+    blog.render()
 
     db.session.add(blog)
-    db.session.commit()
+    bump_row_count(db.session, blog_counter(blog.is_draft), 1)
+
+    try:
+        db.session.commit()
+    except Exception:
+        # e.g. a duplicate title, the uploaded images are not used by any post then
+        db.session.rollback()
+        release_images(blog_image_ids(serialized_data["content"]))
+        raise
+
+    response_cache.invalidate("blog", scope=blog.id)
 
     return jsonify({"success": "Blog was successfully posted!"})
 
@@ -1033,19 +1327,17 @@ def edit_blog():
     fields = request.form.get("fields")
     raw_fields = tuple(json.loads(fields))
     parsed_fields = tuple(
-        filter(lambda x: x not in ["has_img", "img_del", "id"], raw_fields)
+        filter(lambda x: x not in ["has_img", "img_del", "cur_data", "id"], raw_fields)
     )
     schema = BlogPostSchema(only=parsed_fields) if parsed_fields else BlogPostSchema()
     data = {
         key: value
         for key, value in request.form.items()
-        if key not in ["fields", "has_img", "img_del"]
+        if key not in ["fields", "has_img", "img_del", "cur_data"]
     }
 
     is_draft = data.get("is_draft")
     content = data.get("content")
-    has_img = request.form.get("has_img", False, to_bool)
-    img_del = request.form.get("img_del", False, to_bool)
 
     if is_draft:
         data["is_draft"] = to_bool(is_draft)
@@ -1055,29 +1347,67 @@ def edit_blog():
     ).scalar()
 
     if content:
-        content = json.loads(content)
-        if has_img:
-            data["content"] = patch_blog_images(content)
-        elif img_del:
-            cur_data = json.loads(data["cur_data"])
-            res = delete_blog_images(cur_data)
-
-            if not res:
-                return "", 500
+        data["content"] = json.loads(content)
 
     try:
         serialized_data = schema.load(data)
     except ValidationError as err:
         return jsonify({"errors": err.messages}), 403
 
+    added_images = []
+    removed_images = []
+
+    # only the added and replaced images are uploaded, the removed ones are deleted once the edit is saved
+    if schema.only and "content" in schema.only:
+        (
+            serialized_data["content"],
+            failures,
+            added_images,
+            removed_images,
+        ) = patch_blog_images(
+            current_blog.content,
+            serialized_data["content"],
+            max_workers=current_app.config["BLOG_IMAGE_UPLOAD_WORKERS"],
+            timeout=current_app.config["BLOG_IMAGE_DOWNLOAD_TIMEOUT"],
+            deadline=current_app.config["BLOG_IMAGE_UPLOAD_DEADLINE"],
+        )
+
+        if failures:
+            return (
+                jsonify(
+                    {
+                        "error": "Some blog images could not be uploaded to the CDN",
+                        "failures": failures,
+                    }
+                ),
+                502,
+            )
+
+    was_draft = current_blog.is_draft
+
     if schema.only:
         for field in schema.only:
-            if field == "content":
-                current_blog.content = json.dumps(content)
-            else:
-                setattr(current_blog, field, serialized_data[field])
+            setattr(current_blog, field, serialized_data[field])
+
+        if "content" in schema.only:
+            current_blog.render()
+
+    if current_blog.is_draft != was_draft:
+        bump_row_count(db.session, blog_counter(was_draft), -1)
+        bump_row_count(db.session, blog_counter(current_blog.is_draft), 1)
+
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        release_images(added_images)
+        raise
+
+    response_cache.invalidate("blog", scope=current_blog.id)
+
+    # the edit is saved already, so a failing release is only logged
+    release_images(removed_images)
 
-    db.session.commit()
     return jsonify({"success": "Blog has been successfully updated!"})
 
 
@@ -1091,23 +1421,72 @@ def delete_blog():
 
     blog = db.session.execute(db.select(BlogPost).filter_by(id=data["id"])).scalar()
 
-    res = delete_blog_images(blog.content)
+    if blog is None:
+        return jsonify({"error": "Blog not found"}), 404
 
-    if not res:
-        return (
-            jsonify(
-                {
-                    "error": "Something went wrong with deleting the blog images from the CDN"
-                }
-            ),
-            500,
-        )
+    blog_id = blog.id
+    image_ids = blog_image_ids(blog.content)
 
     db.session.delete(blog)
+    bump_row_count(db.session, blog_counter(blog.is_draft), -1)
     db.session.commit()
+    response_cache.invalidate("blog", scope=blog_id)
+
+    # the blog is deleted already, so a failing release is only logged
+    release_images(image_ids)
+
     return jsonify({"success": "Blog was successfully deleted!"})
 
 
+@api.get("/search")
+def search():
+    """
+    This API endpoint searches the published blog posts and the project posts.
+
+    Parameters:
+        q: the search query (web search syntax, e.g. "quoted phrase" or -excluded)
+        type: (optional) "all" (default), "blog" or "project"
+        page: (optional) page number to retrieve
+        size: (optional) amount of results per page
+    Returns:
+        A JSON response containing the ranked and highlighted results of the page and the total amount of results.
+    Raises:
+        400: If the query is missing or the type, page or page size is invalid.
+    """
+    query = request.args.get("q", "").strip()
+    kind = request.args.get("type", "all")
+    page = request.args.get("page", 1, type=int)
+    page_size = request.args.get(
+        "size", current_app.config["SEARCH_PAGE_SIZE"], type=int
+    )
+
+    if not query:
+        return jsonify({"error": "No search query was provided!"}), 400
+
+    if kind not in ("all", "blog", "project"):
+        return jsonify({"error": f'"{kind}" is not a valid search type'}), 400
+
+    if page < 1 or not 0 < page_size <= current_app.config["SEARCH_MAX_PAGE_SIZE"]:
+        return jsonify({"error": "Invalid page or page size!"}), 400
+
+    results, total = search_posts(
+        db.engine,
+        query,
+        ("blog", "project") if kind == "all" else (kind,),
+        page,
+        page_size,
+    )
+
+    return jsonify(
+        {
+            "results": results,
+            "total": total,
+            "page": page,
+            "total_pages": ceil(total / page_size),
+        }
+    )
+
+
 @api.post("/contact/send")
 def send_contact():
     data = request.get_json(silent=True)
@@ -8,10 +8,12 @@ from flask_mail import Mail
 from flask_marshmallow import Marshmallow
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.pool import NullPool
 
 import config as cg
-from utils.sql import showcase_has_data, SQLAlchemyBase
+from utils.cache import response_cache
+from utils.http import http_client
+from utils.pool import build_engine_options, register_pool_events
+from utils.sql import seed_row_counts, showcase_has_data, SQLAlchemyBase
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
@@ -19,7 +21,6 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 db = SQLAlchemy(
     model_class=SQLAlchemyBase,
     disable_autonaming=True,
-    engine_options={"poolclass": NullPool},
 )
 
 ma = Marshmallow()
@@ -41,11 +42,13 @@ def create_app(test=False):
             app.config.from_object(cg.DevConfig())
 
     # init db
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", build_engine_options(app.config))
     db.init_app(app)
 
     import models  # noqa: F401
 
     with app.app_context():
+        register_pool_events(db.engine)
         db.create_all()
 
         if not showcase_has_data(db.engine):
@@ -53,10 +56,15 @@ def create_app(test=False):
             db.session.add(showcase)
             db.session.commit()
 
+        # seed the maintained row counts missing yet (e.g. on a fresh database)
+        seed_row_counts(db.engine)
+
     # init flask library's
     ma.init_app(app)
     migrate.init_app(app, db)
     mail.init_app(app)
+    response_cache.init_app(app)
+    http_client.init_app(app)
 
     # blueprint registrations
     from api import api
@@ -27,12 +27,66 @@ class BaseConfig:
     MAIL_PASSWORD = os.getenv("MAIL_PWD")
     NL_SALT = os.getenv("NL_SALT")
 
+    # database connection pool ("queue" keeps connections open, "null" opens one per checkout)
+    SQLALCHEMY_POOL_MODE = os.getenv("SQLALCHEMY_POOL_MODE", "queue")
+    SQLALCHEMY_POOL_SIZE = 5
+    SQLALCHEMY_POOL_MAX_OVERFLOW = 10
+    SQLALCHEMY_POOL_TIMEOUT = 30
+    SQLALCHEMY_POOL_RECYCLE = 1800
+    SQLALCHEMY_POOL_PRE_PING = True
+
+    # admin link inspector
+    LINK_INSPECTOR_WORKERS = 8
+    LINK_INSPECTOR_TIMEOUT = 30
+    LINK_INSPECTOR_DEADLINE = 120
+    LINK_INSPECTOR_CACHE_TTL = 3600
+
+    # shared client of the outbound HTTP requests (link checks, image downloads, CDN API)
+    HTTP_POOL_CONNECTIONS = 10  # hosts whose connections are kept alive
+    HTTP_POOL_MAXSIZE = 10  # open connections per host
+    HTTP_RETRIES = 2
+    HTTP_BACKOFF_FACTOR = 0.3
+    HTTP_CONNECT_TIMEOUT = 5
+    HTTP_READ_TIMEOUT = 30
+
+    # image uploads to the CDN
+    CDN_MAX_UPLOAD_SIZE = 20 * 1024 * 1024  # bytes
+    CDN_SPOOL_SIZE = (
+        1024 * 1024
+    )  # bytes of an image kept in memory before spooling to disk
+
+    # blog image uploads to the CDN
+    BLOG_IMAGE_UPLOAD_WORKERS = 4
+    BLOG_IMAGE_DOWNLOAD_TIMEOUT = 15
+    BLOG_IMAGE_UPLOAD_DEADLINE = 60
+
+    # admin sql console
+    ADMIN_SQL_STATEMENT_TIMEOUT = 30000  # milliseconds
+    ADMIN_SQL_STREAM_BATCH_SIZE = 500
+
+    # public listings
+    PROJECTS_PAGE_SIZE = 4
+    PROJECTS_MAX_PAGE_SIZE = 50
+    BLOG_PAGE_SIZE = 5
+    BLOG_MAX_PAGE_SIZE = 50
+    SEARCH_PAGE_SIZE = 10
+    SEARCH_MAX_PAGE_SIZE = 50
+
+    # response cache of the public read endpoints
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_MAX_ENTRIES = 512
+    RESPONSE_CACHE_TTL = 300  # seconds, bounds staleness across workers
+    RESPONSE_CACHE_BACKEND = None  # import path of a utils.cache.CacheBackend
+    HTTP_CACHE_MAX_AGE = 0  # seconds browsers and the CDN may reuse a response unchecked (0 revalidates every request)
+
 
 class DevConfig(BaseConfig):
     DEVELOPMENT = True
     MAIL_DEBUG = True
 
     SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_TESTING_DEV_DATABASE_URI")
+    SQLALCHEMY_POOL_SIZE = 2
+    SQLALCHEMY_POOL_MAX_OVERFLOW = 3
 
 
 class TestConfig(BaseConfig):
@@ -47,3 +101,6 @@ class TestConfig(BaseConfig):
 class ProdConfig(BaseConfig):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_PROD_DATABASE_URI")
+    SQLALCHEMY_POOL_SIZE = int(os.getenv("SQLALCHEMY_POOL_SIZE", 10))
+    SQLALCHEMY_POOL_MAX_OVERFLOW = int(os.getenv("SQLALCHEMY_POOL_MAX_OVERFLOW", 20))
+    SQLALCHEMY_POOL_RECYCLE = 280
@@ -0,0 +1,48 @@
+"""store education awards as an array
+
+Revision ID: 0e239256d974
+Revises: 8f3c1d7d1233
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0e239256d974"
+down_revision = "8f3c1d7d1233"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("education", schema=None) as batch_op:
+        batch_op.alter_column(
+            "awards",
+            existing_type=sa.String(),
+            type_=postgresql.ARRAY(sa.String()),
+            existing_nullable=False,
+            server_default="{}",
+            # split like AwardsField: "|" or "," separated, dropping empty awards
+            postgresql_using=(
+                "CASE WHEN btrim(awards) IN ('', 'N/A') THEN '{}'::varchar[] "
+                "ELSE array_remove(regexp_split_to_array(btrim(awards), '\\s*[|,]\\s*'), '')::varchar[] END"
+            ),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("education", schema=None) as batch_op:
+        batch_op.alter_column(
+            "awards",
+            existing_type=postgresql.ARRAY(sa.String()),
+            type_=sa.String(),
+            existing_nullable=False,
+            server_default=None,
+            postgresql_using=(
+                "CASE WHEN cardinality(awards) = 0 THEN 'N/A' "
+                "ELSE array_to_string(awards, '|') END"
+            ),
+        )
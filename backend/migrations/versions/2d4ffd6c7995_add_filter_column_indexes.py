@@ -0,0 +1,39 @@
+"""add indexes for the filtered columns of the public queries
+
+Revision ID: 2d4ffd6c7995
+Revises: f93060b2430c
+Create Date: 2026-10-18 15:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2d4ffd6c7995"
+down_revision = "f93060b2430c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("course", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_course_associated_institute", ["associated_institute"], unique=False
+        )
+
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_blog_post_published_created_at",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_where=sa.text("NOT is_draft"),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.drop_index("ix_blog_post_published_created_at")
+
+    with op.batch_alter_table("course", schema=None) as batch_op:
+        batch_op.drop_index("ix_course_associated_institute")
@@ -0,0 +1,53 @@
+"""pre-render blog html and excerpt
+
+Revision ID: 59816f7299eb
+Revises: d0e5b8a10272
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from utils.render import render_blog_html, render_excerpt
+
+
+# revision identifiers, used by Alembic.
+revision = "59816f7299eb"
+down_revision = "d0e5b8a10272"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("content_html", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("excerpt", sa.Text(), nullable=True))
+
+    # render the existing blog posts
+    blog_post = sa.table(
+        "blog_post",
+        sa.column("id", sa.Integer()),
+        sa.column("content", postgresql.JSONB()),
+        sa.column("content_html", sa.Text()),
+        sa.column("excerpt", sa.Text()),
+    )
+    conn = op.get_bind()
+
+    for blog_id, content in conn.execute(
+        sa.select(blog_post.c.id, blog_post.c.content)
+    ).all():
+        conn.execute(
+            blog_post.update()
+            .where(blog_post.c.id == blog_id)
+            .values(
+                content_html=render_blog_html(content),
+                excerpt=render_excerpt(content),
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.drop_column("excerpt")
+        batch_op.drop_column("content_html")
@@ -0,0 +1,46 @@
+"""add row counter table seeded from the current row counts
+
+Revision ID: 6d3f842d7cce
+Revises: 8281745738cb
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6d3f842d7cce"
+down_revision = "8281745738cb"
+branch_labels = None
+depends_on = None
+
+# counters maintained by the app: name -> (table, filter)
+ROW_COUNTERS = {
+    "project_post": ("project_post", "TRUE"),
+    "blog_post:published": ("blog_post", "is_draft = false"),
+    "blog_post:draft": ("blog_post", "is_draft = true"),
+}
+
+
+def upgrade():
+    # the app creates missing tables on startup, so it may already exist
+    if not sa.inspect(op.get_bind()).has_table("row_counter"):
+        op.create_table(
+            "row_counter",
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+
+    for name, (tablename, where) in ROW_COUNTERS.items():
+        op.execute(
+            sa.text(
+                f"INSERT INTO row_counter (name, count) SELECT :name, count(*) FROM {tablename} WHERE {where} "
+                "ON CONFLICT (name) DO NOTHING"
+            ).bindparams(name=name)
+        )
+
+
+def downgrade():
+    op.drop_table("row_counter")
@@ -0,0 +1,40 @@
+"""add image asset table
+
+Revision ID: 8281745738cb
+Revises: 2d4ffd6c7995
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8281745738cb"
+down_revision = "2d4ffd6c7995"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the app creates missing tables on startup, so it may already exist
+    if not sa.inspect(op.get_bind()).has_table("image_asset"):
+        op.create_table(
+            "image_asset",
+            sa.Column("sha256", sa.String(length=64), nullable=False),
+            sa.Column("file_id", sa.String(), nullable=False),
+            sa.Column("url", sa.String(), nullable=False),
+            sa.Column("refcount", sa.Integer(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+            sa.PrimaryKeyConstraint("sha256"),
+            sa.UniqueConstraint("file_id"),
+        )
+
+
+def downgrade():
+    op.drop_table("image_asset")
@@ -0,0 +1,55 @@
+"""store start and issue dates as dates
+
+Revision ID: 84bad2caebdb
+Revises: 0e239256d974
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "84bad2caebdb"
+down_revision = "0e239256d974"
+branch_labels = None
+depends_on = None
+
+# table -> (date column, index name); education.start_date is already indexed by its unique constraint
+DATE_COLUMNS = {
+    "education": ("start_date", None),
+    "experience_post": ("start_date", "ix_experience_post_start_date"),
+    "cert_and_license": ("issue_date", "ix_cert_and_license_issue_date"),
+    "project_post": ("start_date", "ix_project_post_start_date"),
+}
+
+
+def upgrade():
+    for table, (column, index) in DATE_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            # the dates were stored formatted as "Month YYYY" (e.g. "March 2023")
+            batch_op.alter_column(
+                column,
+                existing_type=sa.String(),
+                type_=sa.Date(),
+                existing_nullable=False,
+                postgresql_using=f"to_date({column}, 'FMMonth YYYY')",
+            )
+
+            if index is not None:
+                batch_op.create_index(index, [column], unique=False)
+
+
+def downgrade():
+    for table, (column, index) in DATE_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if index is not None:
+                batch_op.drop_index(index)
+
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Date(),
+                type_=sa.String(),
+                existing_nullable=False,
+                postgresql_using=f"to_char({column}, 'FMMonth YYYY')",
+            )
@@ -0,0 +1,102 @@
+"""normalize project skills
+
+Revision ID: 8f3c1d7d1233
+Revises: de3d7522e9cd
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "8f3c1d7d1233"
+down_revision = "de3d7522e9cd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    # the app creates missing tables on startup, so they may already exist
+    if not inspector.has_table("skill"):
+        op.create_table(
+            "skill",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("slug", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("slug"),
+        )
+
+    if not inspector.has_table("project_skill"):
+        op.create_table(
+            "project_skill",
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("skill_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["project_id"], ["project_post.id"], ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(["skill_id"], ["skill.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("project_id", "skill_id"),
+        )
+        op.create_index(
+            "ix_project_skill_skill_id",
+            "project_skill",
+            ["skill_id", "project_id"],
+            unique=False,
+        )
+
+    # parse the skills strings of the existing projects
+    conn = op.get_bind()
+    skill = sa.table(
+        "skill",
+        sa.column("id", sa.Integer()),
+        sa.column("name", sa.String()),
+        sa.column("slug", sa.String()),
+    )
+    project_skill = sa.table(
+        "project_skill",
+        sa.column("project_id", sa.Integer()),
+        sa.column("skill_id", sa.Integer()),
+    )
+
+    for project_id, skills in conn.execute(
+        sa.text("SELECT id, skills FROM project_post")
+    ).all():
+        names = {}
+
+        for name in re.split(r"[|,]", skills or ""):
+            name = " ".join(name.split())
+
+            if name:
+                names.setdefault(name.lower(), name)
+
+        if not names:
+            continue
+
+        conn.execute(
+            postgresql.insert(skill)
+            .values([{"name": name, "slug": slug} for slug, name in names.items()])
+            .on_conflict_do_nothing(index_elements=["slug"])
+        )
+        conn.execute(
+            postgresql.insert(project_skill)
+            .from_select(
+                ["project_id", "skill_id"],
+                sa.select(sa.literal(project_id), skill.c.id).where(
+                    skill.c.slug.in_(list(names))
+                ),
+            )
+            .on_conflict_do_nothing()
+        )
+
+
+def downgrade():
+    op.drop_index("ix_project_skill_skill_id", table_name="project_skill")
+    op.drop_table("project_skill")
+    op.drop_table("skill")
@@ -0,0 +1,38 @@
+"""add link status table
+
+Revision ID: ac29daebdcfc
+Revises: 6d3f842d7cce
+Create Date: 2026-10-18 17:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "ac29daebdcfc"
+down_revision = "6d3f842d7cce"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the app creates missing tables on startup, so it may already exist
+    if not sa.inspect(op.get_bind()).has_table("link_status"):
+        op.create_table(
+            "link_status",
+            sa.Column("url", sa.String(), nullable=False),
+            sa.Column(
+                "validity", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+            ),
+            sa.Column("http_code", sa.Integer(), nullable=False),
+            sa.Column("etag", sa.String(), nullable=True),
+            sa.Column("last_modified", sa.String(), nullable=True),
+            sa.Column("checked_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("url"),
+        )
+
+
+def downgrade():
+    op.drop_table("link_status")
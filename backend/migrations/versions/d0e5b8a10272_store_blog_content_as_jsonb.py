@@ -0,0 +1,51 @@
+"""store blog content as jsonb
+
+Revision ID: d0e5b8a10272
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "d0e5b8a10272"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.alter_column(
+            "content",
+            existing_type=sa.String(),
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            existing_nullable=False,
+            postgresql_using="content::jsonb",
+        )
+        batch_op.create_index(
+            "ix_blog_post_content",
+            ["content"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"content": "jsonb_path_ops"},
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.drop_index(
+            "ix_blog_post_content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "jsonb_path_ops"},
+        )
+        batch_op.alter_column(
+            "content",
+            existing_type=postgresql.JSONB(astext_type=sa.Text()),
+            type_=sa.String(),
+            existing_nullable=False,
+            postgresql_using="content::text",
+        )
@@ -0,0 +1,95 @@
+"""add full text search vectors
+
+Revision ID: de3d7522e9cd
+Revises: 59816f7299eb
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from utils.render import render_blog_text
+
+
+# revision identifiers, used by Alembic.
+revision = "de3d7522e9cd"
+down_revision = "59816f7299eb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("content_text", sa.Text(), nullable=True))
+
+    # extract the plain text of the existing blog posts before the search vector is generated from it
+    blog_post = sa.table(
+        "blog_post",
+        sa.column("id", sa.Integer()),
+        sa.column("content", postgresql.JSONB()),
+        sa.column("content_text", sa.Text()),
+    )
+    conn = op.get_bind()
+
+    for blog_id, content in conn.execute(
+        sa.select(blog_post.c.id, blog_post.c.content)
+    ).all():
+        conn.execute(
+            blog_post.update()
+            .where(blog_post.c.id == blog_id)
+            .values(content_text=render_blog_text(content))
+        )
+
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                    "setweight(to_tsvector('english', coalesce(\"desc\", '')), 'B') || "
+                    "setweight(to_tsvector('english', coalesce(content_text, '')), 'C')",
+                    persisted=True,
+                ),
+                nullable=True,
+            )
+        )
+        batch_op.create_index(
+            "ix_blog_post_search_vector",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+    with op.batch_alter_table("project_post", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                    "setweight(to_tsvector('english', coalesce(\"desc\", '')), 'B') || "
+                    "setweight(to_tsvector('english', coalesce(skills, '')), 'B')",
+                    persisted=True,
+                ),
+                nullable=True,
+            )
+        )
+        batch_op.create_index(
+            "ix_project_post_search_vector",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("project_post", schema=None) as batch_op:
+        batch_op.drop_index("ix_project_post_search_vector", postgresql_using="gin")
+        batch_op.drop_column("search_vector")
+
+    with op.batch_alter_table("blog_post", schema=None) as batch_op:
+        batch_op.drop_index("ix_blog_post_search_vector", postgresql_using="gin")
+        batch_op.drop_column("search_vector")
+        batch_op.drop_column("content_text")
@@ -0,0 +1,56 @@
+"""store created_at as timestamptz set by the database
+
+Revision ID: f93060b2430c
+Revises: 84bad2caebdb
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f93060b2430c"
+down_revision = "84bad2caebdb"
+branch_labels = None
+depends_on = None
+
+TABLES = (
+    "blog_post",
+    "education",
+    "experience_post",
+    "cert_and_license",
+    "project_post",
+)
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            # the timestamps were stored formatted as "LL LTS zz" (e.g. "September 12, 2024 11:32:08 PM UTC"),
+            # which postgres' datetime input accepts as is
+            batch_op.alter_column(
+                "created_at",
+                existing_type=sa.String(),
+                type_=sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("now()"),
+                postgresql_using="coalesce(created_at::timestamptz, now())",
+            )
+            batch_op.create_index(
+                f"ix_{table}_created_at", ["created_at"], unique=False
+            )
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f"ix_{table}_created_at")
+            batch_op.alter_column(
+                "created_at",
+                existing_type=sa.DateTime(timezone=True),
+                type_=sa.String(),
+                nullable=True,
+                server_default=None,
+                postgresql_using="to_char(created_at AT TIME ZONE 'UTC', 'FMMonth FMDD, YYYY FMHH12:MI:SS AM \"UTC\"')",
+            )
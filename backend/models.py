@@ -1,15 +1,17 @@
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Optional
+
+import re
 
 import pendulum
 import sqlalchemy as sa
-from marshmallow import validate
+from marshmallow import fields, validate
+from sqlalchemy.dialects.postgresql import ARRAY, insert, TSVECTOR
 from sqlalchemy.dialects.postgresql.json import JSONB
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import load_only, Mapped, mapped_column
 
 from app import db, ma
-
-# get local tz
-local_tz = pendulum.local_timezone()
+from utils.render import render_blog_html, render_blog_text, render_excerpt
 
 
 # database models
@@ -40,21 +42,94 @@ class BlogPost(db.Model):
         :id: unique id that identifies a row
         :title: Title of the blog post
         :created_at: date blog post was made
-        :content: blog post contents
+        :content: blog post contents (Plate editor tree)
+        :content_html: sanitized HTML rendered from the content
+        :excerpt: plain text excerpt of the content
+        :content_text: plain text of the content (used by the search)
+        :search_vector: full text search document of the title, description and content
         :desc: Short description of the blog post
         :is_draft: If blog post is a draft
     """
 
     __tablename__ = "blog_post"
+    __table_args__ = (
+        # lets containment queries over the Plate tree (e.g. content @> '[{"type": "img"}]') use an index
+        sa.Index(
+            "ix_blog_post_content",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "jsonb_path_ops"},
+        ),
+        sa.Index("ix_blog_post_search_vector", "search_vector", postgresql_using="gin"),
+        # serves the published blog listing (newest first) without reading the drafts
+        sa.Index(
+            "ix_blog_post_published_created_at",
+            "created_at",
+            "id",
+            postgresql_where=sa.text("NOT is_draft"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(unique=True, nullable=False)
-    created_at: Mapped[str] = mapped_column(
-        default=pendulum.now(local_tz).format("LL LTS zz")
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+        index=True,
     )
-    content: Mapped[str] = mapped_column(nullable=False)
+    content: Mapped[list[dict[str, Any]]] = mapped_column(JSONB, nullable=False)
+    content_html: Mapped[Optional[str]] = mapped_column(sa.Text)
+    excerpt: Mapped[Optional[str]] = mapped_column(sa.Text)
+    content_text: Mapped[Optional[str]] = mapped_column(sa.Text, deferred=True)
     desc: Mapped[str] = mapped_column(nullable=False, unique=True)
     is_draft: Mapped[bool] = mapped_column(nullable=False, default=False)
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(\"desc\", '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(content_text, '')), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+    def render(self):
+        """
+        Renders the content into the stored HTML, excerpt and plain text, call whenever the content changes.
+        """
+        self.content_html = render_blog_html(self.content)
+        self.excerpt = render_excerpt(self.content)
+        self.content_text = render_blog_text(self.content)
+
+    @staticmethod
+    def listing() -> sa.Select:
+        """
+        Returns a select of the published blog posts, only loading the listed columns (see `BLOG_LIST_FIELDS`).
+        """
+        return (
+            sa.select(BlogPost)
+            .options(load_only(*[getattr(BlogPost, f) for f in BLOG_LIST_FIELDS]))
+            .filter_by(is_draft=False)
+        )
+
+    @staticmethod
+    def drafts() -> sa.Select:
+        """
+        Returns a select of the draft blog posts, newest first.
+        """
+        return (
+            sa.select(BlogPost)
+            .filter_by(is_draft=True)
+            .order_by(BlogPost.created_at.desc())
+        )
+
+
+# columns sent when listing blog posts, the content is only loaded by /blog/singular
+BLOG_LIST_FIELDS = ("id", "title", "desc", "created_at")
+# columns the published blog posts are paged by, newest first
+BLOG_LIST_KEYS = (BlogPost.created_at, BlogPost.id)
 
 
 class Education(db.Model):
@@ -64,11 +139,11 @@ class Education(db.Model):
     params:
         :id: unique id that identifies a row
         :name: name of the institute attended
-        :start_date: month and year that I started attending
+        :start_date: month that I started attending (first day of the month)
         :grad_date: month and year that I graduated or expect to graduate
         :expected_date: date expected to graduate (if applicable)
         :institute_type: type of institution I attended (e.g. high school, university, etc)
-        :awards: Honors & awards received
+        :awards: Honors & awards received (empty if none)
         :major: name of major (if applicable)
         :degree: type of degree earned or expected
         :logo_url: Img CDN url
@@ -82,19 +157,24 @@ class Education(db.Model):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
-    start_date: Mapped[str] = mapped_column(unique=True, nullable=False)
+    start_date: Mapped[date] = mapped_column(sa.Date, unique=True, nullable=False)
     grad_date: Mapped[str] = mapped_column(nullable=False, default="present")
     expected_date: Mapped[Optional[str]] = mapped_column()
     institute_type: Mapped[str] = mapped_column(nullable=False)
-    awards: Mapped[str] = mapped_column(nullable=False)
+    awards: Mapped[list[str]] = mapped_column(
+        ARRAY(sa.String), nullable=False, default=list, server_default="{}"
+    )
     major: Mapped[Optional[str]] = mapped_column()
     degree: Mapped[str] = mapped_column(nullable=False)
     logo_url: Mapped[str] = mapped_column(nullable=False)
     logo_id: Mapped[str] = mapped_column(nullable=False)
     institute_url: Mapped[str] = mapped_column(unique=True, nullable=False)
     small_desc: Mapped[str] = mapped_column(nullable=False)
-    created_at: Mapped[str] = mapped_column(
-        default=pendulum.now(local_tz).format("LL LTS zz")
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+        index=True,
     )
 
 
@@ -117,9 +197,16 @@ class Course(db.Model):
     course_name: Mapped[str] = mapped_column(unique=True, nullable=False)
     course_id: Mapped[str] = mapped_column(unique=True, nullable=False)
     course_url: Mapped[Optional[str]] = mapped_column(unique=True)
-    associated_institute: Mapped[str] = mapped_column(nullable=False)
+    associated_institute: Mapped[str] = mapped_column(nullable=False, index=True)
     desc: Mapped[str] = mapped_column(unique=True, nullable=False)
 
+    @staticmethod
+    def by_institute(institute: str) -> sa.Select:
+        """
+        Returns a select of the courses taken at the given institute.
+        """
+        return sa.select(Course).filter_by(associated_institute=institute)
+
 
 class ExperiencePost(db.Model):
     """
@@ -131,7 +218,7 @@ class ExperiencePost(db.Model):
         :name: name of place
         :type: type of experience (job, internship, volunteer)
         :position: position I had in the place
-        :start_date: month and year I started working in the place
+        :start_date: month I started working in the place (first day of the month)
         :end_date: month and year I stopped working in the place
         :desc: description of my role
         :created_at: date row was created
@@ -143,13 +230,25 @@ class ExperiencePost(db.Model):
     name: Mapped[str] = mapped_column(nullable=False)
     type: Mapped[str] = mapped_column(nullable=False)
     position: Mapped[str] = mapped_column(nullable=False)
-    start_date: Mapped[str] = mapped_column(nullable=False)
+    start_date: Mapped[date] = mapped_column(sa.Date, nullable=False, index=True)
     end_date: Mapped[Optional[str]] = mapped_column(default="present")
     desc: Mapped[str] = mapped_column(nullable=False)
-    created_at: Mapped[str] = mapped_column(
-        default=pendulum.now(local_tz).format("LL LTS zz")
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+        index=True,
     )
 
+    @staticmethod
+    def newest_first() -> sa.Select:
+        """
+        Returns a select of every experience, the most recently started first.
+        """
+        return sa.select(ExperiencePost).order_by(
+            ExperiencePost.start_date.desc(), ExperiencePost.id.desc()
+        )
+
 
 class CertandLicense(db.Model):
     """
@@ -159,7 +258,7 @@ class CertandLicense(db.Model):
         :id: The unique identifier for the certification or license.
         :name: The name of the certification or license.
         :issuing_org: The organization that issued the certification or license.
-        :issue_date: The date when the certification or license was issued.
+        :issue_date: The month when the certification or license was issued (first day of the month).
         :issue_exp: The expiration date of the certification or license (if applicable).
         :credential_id: The ID associated with the certification or license (if applicable).
         :credential_url: The URL to the credential associated with the certification or license.
@@ -171,12 +270,15 @@ class CertandLicense(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(nullable=False)
     issuing_org: Mapped[str] = mapped_column(nullable=False)
-    issue_date: Mapped[str] = mapped_column(nullable=False)
+    issue_date: Mapped[date] = mapped_column(sa.Date, nullable=False, index=True)
     issue_exp: Mapped[Optional[str]] = mapped_column()
     credential_id: Mapped[Optional[str]] = mapped_column()
     credential_url: Mapped[str] = mapped_column(nullable=False)
-    created_at: Mapped[str] = mapped_column(
-        default=pendulum.now(local_tz).format("LL LTS zz")
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+        index=True,
     )
 
 
@@ -187,29 +289,156 @@ class ProjectPost(db.Model):
     params:
         :id: unique id that identifies a row
         :name: name of project
-        :start_date: month and year that the project was started
+        :start_date: month that the project was started (first day of the month)
         :end_date: month and year that the project was finished
         :desc: description of the project
         :skills: Skills used in the project (i.e. "python, javascript, React.js, etc")
         :project_repo_url: url to the project repository
         :project_url: url to the projects website (if applicable)
         :created_at: date row was created
+        :search_vector: full text search document of the name, description and skills
+        :skill_tags: normalized skills of the project (kept in sync with skills by `sync_skills`)
     """
 
     __tablename__ = "project_post"
+    __table_args__ = (
+        sa.Index(
+            "ix_project_post_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
-    start_date: Mapped[str] = mapped_column(nullable=False)
+    start_date: Mapped[date] = mapped_column(sa.Date, nullable=False, index=True)
     end_date: Mapped[str] = mapped_column(nullable=True, default="present")
     desc: Mapped[str] = mapped_column(unique=True, nullable=True)
     skills: Mapped[str] = mapped_column(nullable=False)
     project_repo_url: Mapped[str] = mapped_column(unique=True, nullable=False)
     project_url: Mapped[Optional[str]] = mapped_column(unique=True)
-    created_at: Mapped[str] = mapped_column(
-        default=pendulum.now(local_tz).format("LL LTS zz")
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+        index=True,
+    )
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(\"desc\", '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(skills, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    skill_tags = db.relationship(
+        "Skill", secondary="project_skill", passive_deletes=True
     )
 
+    @staticmethod
+    def by_name(name: str) -> sa.Select:
+        """
+        Returns a select of the project with the given name.
+        """
+        return sa.select(ProjectPost).filter_by(name=name)
+
+    @staticmethod
+    def with_skills(slugs: list[str]) -> sa.Select:
+        """
+        Returns a select of the projects having every one of the given skills (every project if none are given).
+        """
+        stmt = sa.select(ProjectPost)
+
+        if slugs:
+            stmt = stmt.where(ProjectPost.id.in_(Skill.project_ids(slugs)))
+        return stmt
+
+    def sync_skills(self):
+        """
+        Links the project to the normalized skills of its skills string, call whenever the skills change.
+        """
+        self.skill_tags = Skill.get_or_create(Skill.parse(self.skills))
+
+
+# columns the projects are paged by
+PROJECT_LIST_KEYS = (ProjectPost.id,)
+
+
+class Skill(db.Model):
+    """
+    db model for the normalized skills used by project posts
+
+    params:
+        :id: unique id that identifies a row
+        :name: display name of the skill (as first written)
+        :slug: lowercase name the skill is matched and filtered by
+    """
+
+    __tablename__ = "skill"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(nullable=False)
+    slug: Mapped[str] = mapped_column(unique=True, nullable=False)
+
+    @staticmethod
+    def slugify(name: str) -> str:
+        """
+        Returns the slug of a skill name (e.g. " React.js " -> "react.js").
+        """
+        return " ".join(name.split()).lower()
+
+    @staticmethod
+    def parse(skills: Optional[str]) -> list[str]:
+        """
+        Splits a skills string separated by "|" or "," into distinct skill names.
+        """
+        names = {}
+
+        for name in re.split(r"[|,]", skills or ""):
+            name = " ".join(name.split())
+
+            if name:
+                names.setdefault(Skill.slugify(name), name)
+        return list(names.values())
+
+    @staticmethod
+    def get_or_create(names: list[str]) -> list["Skill"]:
+        """
+        Returns the skills of the given names, creating the missing ones.
+        """
+        if not names:
+            return []
+
+        slugs = [Skill.slugify(name) for name in names]
+
+        db.session.execute(
+            insert(Skill)
+            .values([{"name": name, "slug": Skill.slugify(name)} for name in names])
+            .on_conflict_do_nothing(index_elements=["slug"])
+        )
+        skills = db.session.execute(
+            db.select(Skill).where(Skill.slug.in_(slugs))
+        ).scalars()
+
+        by_slug = {skill.slug: skill for skill in skills}
+        return [by_slug[slug] for slug in slugs]
+
+    @staticmethod
+    def project_ids(slugs: list[str]) -> sa.Select:
+        """
+        Returns a select of the ids of the projects having every one of the given skills.
+        """
+        # a repeated skill would otherwise be counted twice but only matched once
+        slugs = set(slugs)
+
+        return (
+            sa.select(project_skill.c.project_id)
+            .join(Skill, Skill.id == project_skill.c.skill_id)
+            .where(Skill.slug.in_(slugs))
+            .group_by(project_skill.c.project_id)
+            .having(sa.func.count() == len(slugs))
+        )
+
 
 class Showcase(db.Model):
     """
@@ -240,6 +469,69 @@ class Showcase(db.Model):
             self.project_posts.remove(project_post)
 
 
+class RowCounter(db.Model):
+    """
+    db model for row counts maintained on every add and delete (so listings skip a count(*))
+
+    params:
+        :name: name of the counter (e.g. "project_post" or "blog_post:published")
+        :count: amount of rows counted
+    """
+
+    __tablename__ = "row_counter"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+
+class LinkStatus(db.Model):
+    """
+    db model caching the last known status of a link checked by the admin link inspector
+
+    params:
+        :url: the checked url
+        :validity: True if the link is valid, False or a failure message otherwise
+        :http_code: HTTP status code returned when the link was checked
+        :etag: ETag returned by the link (used for conditional revalidation)
+        :last_modified: Last-Modified header returned by the link (used for conditional revalidation)
+        :checked_at: date and time the link was last checked
+    """
+
+    __tablename__ = "link_status"
+
+    url: Mapped[str] = mapped_column(primary_key=True)
+    validity: Mapped[Any] = mapped_column(JSONB, nullable=False)
+    http_code: Mapped[int] = mapped_column(nullable=False)
+    etag: Mapped[Optional[str]] = mapped_column()
+    last_modified: Mapped[Optional[str]] = mapped_column()
+    checked_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), nullable=False
+    )
+
+
+class ImageAsset(db.Model):
+    """
+    db model for the images uploaded to the CDN, keyed by their content (so identical images are uploaded once)
+
+    params:
+        :sha256: hex SHA-256 digest of the image bytes
+        :file_id: CDN id of the image
+        :url: CDN url of the image
+        :refcount: amount of records using the image (deleted from the CDN once it drops to zero)
+        :created_at: date the image was uploaded
+    """
+
+    __tablename__ = "image_asset"
+
+    sha256: Mapped[str] = mapped_column(sa.String(64), primary_key=True)
+    file_id: Mapped[str] = mapped_column(unique=True, nullable=False)
+    url: Mapped[str] = mapped_column(nullable=False)
+    refcount: Mapped[int] = mapped_column(nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+    )
+
+
 # db Table
 project_showcase = db.Table(
     "project_showcase",
@@ -251,6 +543,73 @@ project_showcase = db.Table(
     sa.Column("showcase_id", sa.ForeignKey(Showcase.id), primary_key=True),
 )
 
+project_skill = db.Table(
+    "project_skill",
+    sa.Column(
+        "project_id",
+        sa.ForeignKey(ProjectPost.id, ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    sa.Column(
+        "skill_id",
+        sa.ForeignKey(Skill.id, ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    # serves the skill filter and facet counts with index only scans
+    sa.Index("ix_project_skill_skill_id", "skill_id", "project_id"),
+)
+
+
+# model schema fields
+class AwardsField(fields.List):
+    """
+    List of awards that also loads the "|" (or ",") separated string sent by the forms, "N/A" meaning no awards.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(fields.String(), **kwargs)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, str):
+            value = [] if value.strip() in ("", "N/A") else re.split(r"[|,]", value)
+            value = [award.strip() for award in value if award.strip()]
+        return super()._deserialize(value, attr, data, **kwargs)
+
+
+class MonthYearField(fields.Date):
+    """
+    Date stored as the first day of its month, loaded from "MM/YYYY" (sent by the forms) or "Month YYYY"
+    and dumped as "Month YYYY".
+    """
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, str):
+            for fmt in ("MM/YYYY", "MMMM YYYY"):
+                try:
+                    return pendulum.from_format(value.strip(), fmt).date()
+                except ValueError:
+                    continue
+        return super()._deserialize(value, attr, data, **kwargs)
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        return pendulum.date(value.year, value.month, value.day).format("MMMM YYYY")
+
+
+class TimestampField(fields.DateTime):
+    """
+    Creation timestamp (set by the database) dumped in UTC as "Month D, YYYY h:mm:ss A UTC".
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(dump_only=True, **kwargs)
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        return pendulum.instance(value).in_tz("UTC").format("LL LTS zz")
+
 
 # model schemas
 class AdminSchema(ma.SQLAlchemyAutoSchema):
@@ -264,12 +623,21 @@ class AdminSchema(ma.SQLAlchemyAutoSchema):
 class BlogPostSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = BlogPost
+        exclude = ("content_text", "search_vector")
+
+    created_at = TimestampField()
+    content_html = ma.auto_field(dump_only=True)
+    excerpt = ma.auto_field(dump_only=True)
 
 
 class EducationSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Education
 
+    awards = AwardsField(required=True)
+    start_date = MonthYearField(required=True)
+    created_at = TimestampField()
+
     institute_type = ma.auto_field(
         validate=[
             validate.OneOf(
@@ -303,6 +671,9 @@ class ExperiencePostSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = ExperiencePost
 
+    start_date = MonthYearField(required=True)
+    created_at = TimestampField()
+
     type = ma.auto_field(
         validate=[
             validate.OneOf(
@@ -321,6 +692,9 @@ class CertandLicenseSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = CertandLicense
 
+    issue_date = MonthYearField(required=True)
+    created_at = TimestampField()
+
     credential_url = ma.auto_field(
         validate=[validate.URL(schemes={"https", "http"}, require_tld=True)]
     )
@@ -330,6 +704,10 @@ class ProjectPostSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = ProjectPost
         include_fk = True
+        exclude = ("search_vector",)
+
+    start_date = MonthYearField(required=True)
+    created_at = TimestampField()
 
     project_repo_url = ma.auto_field(
         validate=[validate.URL(schemes={"https", "http"}, require_tld=True)]
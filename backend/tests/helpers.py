@@ -1,6 +1,11 @@
 # imports
+import sqlalchemy as sa
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from werkzeug.test import TestResponse
 from enum import IntEnum
+from typing import Iterator
 
 
 # Used HTTP code Enum
@@ -12,20 +17,26 @@ class HTTPCode(IntEnum):
         PASS (int): HTTP status code 200 (OK) - The request has succeeded.
         NO_CONTENT (int): HTTP status code 204 (No Content) - The server successfully processed the request,
         but is not returning any content.
+        NOT_MODIFIED (int): HTTP status code 304 (Not Modified) - The cached version of the requested content
+        is still valid.
         BAD_REQ (int): HTTP status code 400 (Bad Request) - The server cannot or will not process
         the request due to an apparent client error.
         FORBIDDEN (int): HTTP status code 403 (Forbidden) - The server understood the request but refuses
         to authorize it.
         NOT_FOUND (int): HTTP status code 404 (Not Found) - The server did not find the requested content
+        PAYLOAD_TOO_LARGE (int): HTTP status code 413 (Payload Too Large) - The request is larger than the server
+        is willing to process.
         INTERNAL_SERVER_ERR (int): HTTP status code 500 (Internal Server Error) - A generic error message returned
         when an unexpected condition was encountered on the server.
     """
 
     PASS = 200
     NO_CONTENT = 204
+    NOT_MODIFIED = 304
     BAD_REQ = 400
     FORBIDDEN = 403
     NOT_FOUND = 404
+    PAYLOAD_TOO_LARGE = 413
     INTERNAL_SERVER_ERR = 500
 
 
@@ -78,3 +89,84 @@ def assert_not_status_code(msg: str, **kwargs):
         return
     else:
         raise AssertionError(msg)
+
+
+def _plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def assert_index_scan(engine: sa.Engine, stmt: sa.Executable, tables: set[str]):
+    """
+    Asserts that a query does not read any of the given tables with a sequential scan.
+
+    The test tables only hold a few rows, for which the planner always prefers a sequential scan,
+    so the query is explained with enable_seqscan off: a sequential scan is then only planned
+    when no index can serve the query.
+    Args:
+        engine (sa.Engine): The engine of the test database.
+        stmt (sa.Executable): The query to explain (e.g. the select statement of a route).
+        tables (set[str]): Tables that must be read through an index.
+    Raises:
+        AssertionError: If the plan has a sequential scan on one of the tables.
+    Example:
+        >>> assert_index_scan(engine, sa.select(Course).filter_by(associated_institute="x"), {"course"})
+    """
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+
+    with engine.connect() as conn:
+        conn.execute(sa.text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(sa.text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+
+    seq_scans = [
+        node["Relation Name"]
+        for node in _plan_nodes(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in tables
+    ]
+
+    assert (
+        not seq_scans
+    ), f"Query falls back to a sequential scan on {seq_scans}:\n{sql}"
+
+
+@contextmanager
+def serve_bytes(payload: bytes, content_length: bool = True) -> Iterator[str]:
+    """
+    Serves a payload over HTTP on localhost for the duration of the context.
+    Args:
+        payload (bytes): The body of every GET response.
+        content_length (bool): If the responses announce their size (otherwise the body is sent until the connection closes).
+    Yields:
+        str: The url serving the payload.
+    Example:
+        >>> with serve_bytes(b"0" * 2048) as url:
+        ...     requests.get(url)
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+
+            if content_length:
+                self.send_header("Content-Length", str(len(payload)))
+            else:
+                self.send_header("Connection", "close")
+
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/image.png"
+    finally:
+        server.shutdown()
+        server.server_close()
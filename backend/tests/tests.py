@@ -4,12 +4,54 @@ import json
 import random
 import string
 import base64
+import io
+import time
 from pytest_assert_utils import assert_model_attrs, util
 from collections import namedtuple
 from itsdangerous.exc import BadSignature
 from flask import session, current_app
 from copy import copy
-from helpers import assert_status_code, assert_not_status_code, HTTPCode
+import pendulum
+from sqlalchemy import delete
+from urllib3.response import HTTPResponse
+from models import (
+    BLOG_LIST_FIELDS,
+    BLOG_LIST_KEYS,
+    BlogPost,
+    Course,
+    ExperiencePost,
+    ImageAsset,
+    LinkStatus,
+    PROJECT_LIST_KEYS,
+    ProjectPost,
+)
+from app import db
+from werkzeug.datastructures import FileStorage
+from utils import cdn
+from utils.cdn import (
+    ImageTooLargeError,
+    acquire_image,
+    delete_image,
+    diff_blog_images,
+    upload_blog_images,
+    upload_image,
+    UPLOAD_URL,
+)
+from utils.http import CappedRetry, http_client, MAX_RETRY_AFTER
+from utils.links import LinkStatusCache
+from utils.sql import (
+    encode_cursor,
+    keyset_select,
+    paginate_project_posts_select,
+    show_blog_posts_select,
+)
+from helpers import (
+    assert_status_code,
+    assert_not_status_code,
+    assert_index_scan,
+    HTTPCode,
+    serve_bytes,
+)
 
 
 # tests
@@ -134,6 +176,90 @@ def test_link_inspector(client, datadir, user):
     ), "report data did not match the expected data"
 
 
+def test_link_inspector_job(client, datadir, user):
+    # test preparation
+    expected_data = json.load(datadir["link_inspector.json"].open("r"))
+
+    # test polling a job that does not exist
+    res = client.get(
+        "/admin/links/jobs/doesnotexist", headers={"Authorization": f"Bearer {user}"}
+    )
+
+    assert_status_code(res, HTTPCode.NOT_FOUND)
+
+    # test starting a job
+    res = client.post("/admin/links", headers={"Authorization": f"Bearer {user}"})
+
+    assert_status_code(res, 202)
+    job_id = res.json["job"]["job_id"]
+
+    # test polling the job until it finishes
+    for _ in range(60):
+        res = client.get(
+            f"/admin/links/jobs/{job_id}", headers={"Authorization": f"Bearer {user}"}
+        )
+
+        if res.json["job"]["status"] in ("finished", "failed"):
+            break
+        time.sleep(1)
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json["job"]["status"] == "finished", "Link inspection job did not finish"
+    assert (
+        res.json["job"]["report"] == expected_data
+    ), "report data did not match the expected data"
+
+    # test that the latest job keeps its results
+    res = client.get(
+        "/admin/links/jobs/latest", headers={"Authorization": f"Bearer {user}"}
+    )
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json["job"]["job_id"] == job_id, "Latest job is not the started job"
+
+
+def test_link_status_cache(sa_engine):
+    # test preparation
+    url = "https://example.com/cached-link"
+    status = {
+        "validity": True,
+        "http_code": 200,
+        "etag": '"abc"',
+        "last_modified": None,
+        "checked_at": pendulum.now("UTC"),
+    }
+
+    # test a url that was never checked is not cached
+    cache = LinkStatusCache(sa_engine, ttl=60)
+    cache.load([url])
+
+    assert cache.get(url) is None
+    assert not cache.is_fresh(url)
+
+    # test a saved status is read back by the next inspection
+    cache.put(url, status)
+    cache.save()
+
+    try:
+        cache = LinkStatusCache(sa_engine, ttl=60)
+        cache.load([url])
+
+        assert util.Dict.containing(
+            validity=True, http_code=200, etag='"abc"'
+        ) == cache.get(url), "Cached status did not match the saved status"
+        assert cache.is_fresh(url), "Saved status was not fresh"
+    finally:
+        with sa_engine.begin() as conn:
+            conn.execute(delete(LinkStatus).where(LinkStatus.url == url))
+
+
+def test_retry_after_cap():
+    retry = CappedRetry(total=2, respect_retry_after_header=True)
+    res = HTTPResponse(status=429, headers={"Retry-After": "3600"})
+
+    assert retry.get_retry_after(res) == MAX_RETRY_AFTER, "Retry-After was not capped"
+
+
 def test_execute_sql(client, datadir, user):
     # test preparation
     expected_data = json.load(datadir["execute_sql.json"].open("r"))
@@ -157,6 +283,18 @@ def test_execute_sql(client, datadir, user):
     assert_status_code(res, HTTPCode.PASS)
     assert res.json["res"] == expected_data, "result json did not match expected data"
 
+    # test submission with aliased columns and lowercase keywords
+    res = client.post(
+        "/admin/sql",
+        json={"query": "username AS name, email from admin where id = 1"},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json["res"] == [
+        {"name": expected_data[0]["username"], "email": expected_data[0]["email"]}
+    ], "result json did not use the column labels of the query"
+
     # test submission with invalid query (non existent table)
     res = client.post(
         "/admin/sql",
@@ -172,6 +310,166 @@ def test_execute_sql(client, datadir, user):
     ), "Result JSON does not contain error message object"
 
 
+def test_execute_sql_paging(client, user):
+    # test submission with an invalid limit
+    res = client.post(
+        "/admin/sql",
+        json={"query": "* FROM admin", "limit": 0},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+
+    # test keyset paging
+    res = client.post(
+        "/admin/sql",
+        json={"query": "id, username FROM admin", "limit": 1, "cursor_key": "id"},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json == {
+        "res": [{"id": 1, "username": "Administrator"}],
+        "next_cursor": 1,
+    }, "result json did not contain the first page and its cursor"
+
+    res = client.post(
+        "/admin/sql",
+        json={"query": "id, username FROM admin", "limit": 1, "after": 1},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, 206)
+
+    # test streaming
+    res = client.post(
+        "/admin/sql",
+        json={"query": "id, username FROM admin", "stream": True},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in res.get_data(as_text=True).splitlines()] == [
+        {"id": 1, "username": "Administrator"}
+    ], "streamed rows did not match expected data"
+
+
+def test_execute_sql_read_only(client, user):
+    # test a CTE with a join and the SELECT keyword written out
+    res = client.post(
+        "/admin/sql",
+        json={
+            "query": "WITH a AS (SELECT id, username FROM admin) "
+            "SELECT a.username, b.email FROM a JOIN admin b ON a.id = b.id"
+        },
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json["res"] == [
+        {"username": "Administrator", "email": "admin@admin.com"}
+    ], "result json did not match expected data"
+
+    # test that writes are rejected by the read only transaction
+    res = client.post(
+        "/admin/sql",
+        json={"query": "WITH d AS (DELETE FROM admin RETURNING *) SELECT * FROM d"},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+    assert "read-only" in res.json["err_msg"], "Write was not rejected"
+
+    # test that multiple statements are rejected
+    res = client.post(
+        "/admin/sql",
+        json={"query": "* FROM admin; DROP TABLE admin"},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+
+    # test that a ";" inside a string literal or comment and a trailing ";" are allowed
+    res = client.post(
+        "/admin/sql",
+        json={"query": "username FROM admin WHERE username <> 'a;b' -- c;d\n;"},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json["res"] == [
+        {"username": "Administrator"}
+    ], "result json did not match expected data"
+
+    # test explain
+    res = client.post(
+        "/admin/sql",
+        json={"query": "* FROM admin", "explain": True},
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert any(
+        "actual time" in line for line in res.json["plan"]
+    ), "Plan was not analyzed"
+
+
+def test_pool_metrics(client, user):
+    # test without bearer token
+    res = client.get("/admin/metrics/pool")
+
+    assert_status_code(res, HTTPCode.FORBIDDEN)
+
+    # test full functionality
+    res = client.get("/admin/metrics/pool", headers={"Authorization": f"Bearer {user}"})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json["pool"]["pool_class"] == "InstrumentedQueuePool"
+    assert (
+        res.json["pool"]["checkouts"] > 0
+    ), "Pool metrics did not record any connection checkouts"
+
+
+def test_query_plans(sa_engine):
+    # the statements of the public routes (and the showcase lookup), built by the same functions
+    # the routes use, must be served by an index
+    blog_cursor = encode_cursor(["2024-09-12T23:32:08+00:00", 1])
+    route_queries = [
+        (Course.by_institute("Educational Institute"), {"course"}),
+        (show_blog_posts_select(BlogPost, 5, BLOG_LIST_FIELDS), {"blog_post"}),
+        (
+            keyset_select(
+                BlogPost.listing(),
+                BLOG_LIST_KEYS,
+                cursor=blog_cursor,
+                page_size=5,
+                descending=True,
+            ),
+            {"blog_post"},
+        ),
+        (BlogPost.drafts(), {"blog_post"}),
+        (ProjectPost.by_name("Example Project"), {"project_post"}),
+        (
+            keyset_select(
+                ProjectPost.with_skills([]),
+                PROJECT_LIST_KEYS,
+                cursor=encode_cursor([1]),
+            ),
+            {"project_post"},
+        ),
+        (
+            keyset_select(ProjectPost.with_skills(["python"]), PROJECT_LIST_KEYS),
+            {"project_post", "project_skill"},
+        ),
+        (paginate_project_posts_select(ProjectPost, 2), {"project_post"}),
+        (ExperiencePost.newest_first(), {"experience_post"}),
+    ]
+
+    for stmt, tables in route_queries:
+        assert_index_scan(sa_engine, stmt, tables)
+
+
 # course
 
 
@@ -355,7 +653,7 @@ def test_get_educational_institutes(client):
         start_date="August 2023",
         grad_date="May 2027",
         institute_type="University",
-        awards="['STEM Scholar', 'Educational Leaders']",
+        awards=["STEM Scholar", "Educational Leaders"],
         major="Computer Science",
         degree="Bachelors of Science",
         expected_date=None,
@@ -566,6 +864,35 @@ def test_get_showcase(client, datadir):
     ), "Result JSON did not contain the expected data"
 
 
+def test_get_showcase_conditional(client, user):
+    # test the response carries the validators
+    res = client.get("/showcase")
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.headers.get("ETag"), "Response did not contain an ETag"
+    assert "public" in res.headers.get(
+        "Cache-Control", ""
+    ), "Response did not contain the expected Cache-Control header"
+
+    # test a matching conditional request is answered without a body
+    etag = res.headers["ETag"]
+    res = client.get("/showcase", headers={"If-None-Match": etag})
+
+    assert_status_code(res, HTTPCode.NOT_MODIFIED)
+    assert res.data == b"", "304 response was not empty"
+
+    # test authenticated responses are not stored by shared caches
+    res = client.get("/showcase", headers={"Authorization": f"Bearer {user}"})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert "private" in res.headers.get(
+        "Cache-Control", ""
+    ), "Authenticated response was not marked private"
+    assert "public" not in res.headers.get(
+        "Cache-Control", ""
+    ), "Authenticated response was marked public"
+
+
 def test_get_projects(client, datadir):
     # test preparation
     comparator = json.load(datadir["projects.json"].open("r"))["get"]
@@ -577,6 +904,38 @@ def test_get_projects(client, datadir):
     assert comparator == res.json[0], "Result JSON did not contain the expected data"
 
 
+def test_get_projects_keyset(client, datadir):
+    # test preparation
+    comparator = json.load(datadir["projects.json"].open("r"))["get"]
+
+    # test full functionality
+    res = client.get("/projects", query_string={"size": 4})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        res.json["projects"][0] == comparator
+    ), "Result JSON did not contain the expected data"
+    assert (
+        util.Dict.containing(next_cursor=None, prev_cursor=None, total=1, total_pages=1)
+        == res.json
+    ), "Result JSON did not contain the expected cursors and totals"
+
+    # test invalid cursor and page size
+    res = client.get("/projects", query_string={"cursor": "not a cursor"})
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+
+    # test well formed cursors with the wrong amount or types of key values
+    for values in ([], [1, 2], ["1"], [True]):
+        res = client.get("/projects", query_string={"cursor": encode_cursor(values)})
+
+        assert_status_code(res, HTTPCode.BAD_REQ)
+
+    res = client.get("/projects", query_string={"size": 0})
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+
+
 def test_get_project_totalpages(client):
     # test full functionality
     res = client.get("/projects/totalpages")
@@ -587,6 +946,75 @@ def test_get_project_totalpages(client):
     ), "Result JSON data did not match one page as expected"
 
 
+def test_search(client):
+    # test request with no query
+    res = client.get("/search")
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+
+    # test request with an invalid type
+    res = client.get("/search", query_string={"q": "example", "type": "course"})
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+
+    # test full functionality
+    res = client.get("/search", query_string={"q": "example"})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(total=1, page=1, total_pages=1) == res.json
+    ), "Result JSON did not contain the expected totals"
+    assert (
+        util.Dict.containing(type="project", id=1, title="Example Project")
+        == res.json["results"][0]
+    ), "Result JSON did not contain the matching project"
+    assert (
+        "<mark>" in res.json["results"][0]["headline"]
+    ), "Result headline did not highlight the match"
+
+    # test a page past the last one still reports the total
+    res = client.get("/search", query_string={"q": "example", "page": 5})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(results=[], total=1, page=5) == res.json
+    ), "Result JSON did not keep the total past the last page"
+
+
+def test_get_project_skills(client):
+    # test the facet counts
+    res = client.get("/projects/skills")
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(name="python", slug="python", count=1)
+        in res.json["skills"]
+    ), "Result JSON did not contain the expected skill facet"
+
+    # test filtering the projects by skill
+    res = client.get("/projects", query_string={"skill": ["Python", "frontend"]})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(total=1) == res.json
+    ), "Result JSON did not contain the project with both skills"
+
+    # test a repeated skill filters like a single one
+    res = client.get("/projects", query_string={"skill": ["Python", "python"]})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(total=1) == res.json
+    ), "Result JSON did not contain the project for a repeated skill"
+
+    res = client.get("/projects", query_string={"skill": "rust"})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(projects=[], total=0) == res.json
+    ), "Result JSON contained projects without the skill"
+
+
 def test_add_project(client, user, datadir):
     # test preparation
     project = json.load(datadir["projects.json"].open("r"))["add"]
@@ -626,6 +1054,14 @@ def test_add_project(client, user, datadir):
         success=f'{project["valid"]["name"]} was successfully added!'
     ), "Result JSON did not contain expected message"
 
+    # test the maintained project count followed the insert
+    res = client.get("/projects")
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(total=2) == res.json
+    ), "Result JSON did not contain the updated project count"
+
 
 def test_edit_project(client, user, datadir):
     # test preparation
@@ -666,6 +1102,14 @@ def test_delete_project(client, user):
         == res.json
     ), "Result JSON did not contain the expected data"
 
+    # test the maintained project count followed the delete
+    res = client.get("/projects")
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(total=1) == res.json
+    ), "Result JSON did not contain the updated project count"
+
 
 def test_get_no_blogs(client):
     # tests whether 204 HTTP code was returned
@@ -703,3 +1147,225 @@ def test_add_blog(client, user, datadir):
     )
 
     assert_status_code(res, HTTPCode.PASS)
+
+
+def test_get_blog(client, datadir):
+    # test preparation
+    blog = json.load(datadir["blog.json"].open("r"))["add"]
+
+    # test the content is sent as the stored editor tree
+    res = client.get("/blog/singular", query_string={"id": 1, "edit": True})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert res.json["content"] == json.loads(
+        blog["content"]
+    ), "Result JSON did not contain the blog content as a list of nodes"
+
+    # test readers get the pre-rendered html and excerpt instead of the editor tree
+    res = client.get("/blog/singular", query_string={"id": 1})
+
+    assert_status_code(res, HTTPCode.PASS)
+    assert (
+        util.Dict.containing(content_html="<p>test content</p>", excerpt="test content")
+        == res.json
+    ), "Result JSON did not contain the rendered blog content"
+    assert "content" not in res.json, "Result JSON contained the editor tree"
+
+
+def test_get_blogs(client):
+    # tests that the added draft blog is not listed
+    res = client.get("/blog")
+
+    assert_status_code(res, HTTPCode.NO_CONTENT)
+
+    # test request with an invalid page size
+    res = client.get("/blog", query_string={"size": 0})
+
+    assert_status_code(res, HTTPCode.BAD_REQ)
+
+
+def test_delete_blog(client, user):
+    # test deleting a blog that does not exist
+    res = client.delete(
+        "/blog/delete", json={"id": 999999}, headers={"Authorization": f"Bearer {user}"}
+    )
+
+    assert_status_code(res, HTTPCode.NOT_FOUND)
+
+
+def test_image_size_cap(app, app_ctx, client, user, datadir, monkeypatch):
+    # test preparation
+    monkeypatch.setitem(app.config, "CDN_MAX_UPLOAD_SIZE", 1024)
+    send = http_client.request
+
+    def request(method, url, *args, **kwargs):
+        if url == UPLOAD_URL:
+            pytest.fail("An oversized image reached the CDN")
+        return send(method, url, *args, **kwargs)
+
+    monkeypatch.setattr(http_client, "request", request)
+    payload = b"0" * 2048
+
+    # test an oversized upload stream is refused
+    with pytest.raises(ImageTooLargeError):
+        upload_image(
+            FileStorage(io.BytesIO(payload), "large.png", content_type="image/png"),
+            "large.png",
+        )
+
+    # test oversized data urls and downloads (announced or not) are refused
+    with (
+        serve_bytes(payload) as url,
+        serve_bytes(payload, content_length=False) as unsized_url,
+    ):
+        data = [
+            {
+                "type": "img",
+                "url": f"data:image/png;base64,{base64.b64encode(payload).decode()}",
+            },
+            {"type": "img", "url": url},
+            {"type": "img", "url": unsized_url},
+        ]
+        _, failures = upload_blog_images(data, timeout=5, deadline=30)
+
+    assert [failure["index"] for failure in failures] == [0, 1, 2]
+    assert all(
+        failure["error"] == "The image is larger than the maximum upload size"
+        for failure in failures
+    ), "An oversized image was not refused for its size"
+
+    # test an oversized logo is answered with 413
+    education_json = json.load(datadir["education.json"].open("r"))["add"]
+    res = client.post(
+        "/education/institute/add",
+        data={
+            "other": json.dumps(education_json["w_grad_d_n_expected"]),
+            "file": datadir["imgs/2nd_Educational_Institute.png"].open("rb"),
+        },
+        headers={"Authorization": f"Bearer {user}"},
+    )
+
+    assert_status_code(res, HTTPCode.PAYLOAD_TOO_LARGE)
+
+
+def test_upload_blog_images(app_ctx, monkeypatch):
+    # test preparation: a stubbed upload per url ("slow" finishes after the deadline, "broken" fails)
+    released = []
+
+    def transfer(app, url, timeout):
+        if url == "slow":
+            time.sleep(1)
+        if url == "broken":
+            raise RuntimeError("The CDN did not accept the image")
+        return f"https://ik.imagekit.io/{url}.png", f"id-{url}"
+
+    def release(img_ids):
+        released.extend(img_ids)
+        return True
+
+    monkeypatch.setattr(cdn, "_transfer_image", transfer)
+    monkeypatch.setattr(cdn, "release_images", release)
+
+    def nodes(*urls):
+        return [{"type": "p", "children": [{"text": "intro"}]}] + [
+            {"type": "img", "url": url} for url in urls
+        ]
+
+    # test every node gets its own upload, in order
+    data, failures = upload_blog_images(nodes("a", "b"), deadline=5)
+
+    assert failures == []
+    assert [row.get("id") for row in data] == [None, "id-a", "id-b"]
+    assert released == [], "A successful post released its images"
+
+    # test a failure releases the images already uploaded
+    data, failures = upload_blog_images(nodes("a", "broken"), deadline=5)
+
+    assert failures == [{"index": 2, "error": "The CDN did not accept the image"}]
+    assert released == ["id-a"], "The uploaded image was not released"
+    assert "id" not in data[1], "A failed post kept the uploaded image"
+
+    # test an upload still running at the deadline is released once it finishes
+    released.clear()
+    data, failures = upload_blog_images(nodes("a", "slow"), deadline=0.2)
+
+    assert failures == [
+        {"index": 2, "error": "Upload did not finish before the upload deadline"}
+    ]
+    assert released == ["id-a"], "The finished upload was not released"
+
+    time.sleep(1.5)
+
+    assert released == [
+        "id-a",
+        "id-slow",
+    ], "The upload finishing after the deadline was not released"
+
+
+def test_diff_blog_images():
+    stored = [
+        {"type": "p", "children": [{"text": "intro"}]},
+        {"type": "img", "id": "kept", "url": "https://ik.imagekit.io/a.png"},
+        {"type": "img", "id": "replaced", "url": "https://ik.imagekit.io/b.png"},
+        {"type": "img", "id": "removed", "url": "https://ik.imagekit.io/c.png"},
+    ]
+    edited = [
+        {"type": "img", "id": "kept", "url": "https://ik.imagekit.io/a.png"},
+        {"type": "p", "children": [{"text": "edited intro"}]},
+        {"type": "img", "id": "replaced", "url": "https://example.com/new.png"},
+        {"type": "img", "url": "https://example.com/added.png"},
+    ]
+
+    changed, copied, removed = diff_blog_images(stored, edited)
+
+    assert changed == [2, 3], "Only the replaced and added images should be uploaded"
+    assert copied == [], "No image should need another reference"
+    assert removed == [
+        "replaced",
+        "removed",
+    ], "The replaced and removed images should be released"
+
+    # test an edit that does not touch the images transfers nothing
+    assert diff_blog_images(stored, copy(stored)) == ([], [], [])
+
+    # test every img node holds its own reference
+    image = {"type": "img", "id": "shared", "url": "https://ik.imagekit.io/d.png"}
+
+    assert diff_blog_images([image, copy(image)], [image]) == (
+        [],
+        [],
+        ["shared"],
+    ), "Removing one of two identical images should release one reference"
+    assert diff_blog_images([image], [image, copy(image)]) == (
+        [],
+        [1],
+        [],
+    ), "A copied image should take another reference"
+
+
+def test_image_refcount(app_ctx, sa_engine):
+    asset = ImageAsset(
+        sha256="0" * 64,
+        file_id="refcounted",
+        url="https://ik.imagekit.io/refcounted.png",
+        refcount=1,
+    )
+    db.session.add(asset)
+    db.session.commit()
+
+    try:
+        assert acquire_image("refcounted"), "A tracked image should take a reference"
+        db.session.refresh(asset)
+        assert asset.refcount == 2
+
+        # the file is still referenced, so only the reference is dropped (the CDN is not reached)
+        assert delete_image("refcounted")
+        db.session.refresh(asset)
+        assert asset.refcount == 1
+
+        assert not acquire_image(
+            "untracked"
+        ), "An untracked image should not take a reference"
+    finally:
+        db.session.delete(asset)
+        db.session.commit()
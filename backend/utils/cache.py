@@ -0,0 +1,271 @@
+"""
+This module contains the response cache used by the public read endpoints.
+
+Classes:
+- CacheBackend: Interface of the storage used by the response cache.
+- LRUCache: In-process least recently used cache backend.
+- ResponseCache: Caches view responses keyed by route and arguments.
+
+Functions:
+- conditional_response: Decorator adding an ETag and Cache-Control header and answering conditional requests.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from time import monotonic
+from typing import Any, Callable, Optional, Tuple
+
+from flask import current_app, Flask, make_response, request, Response
+from werkzeug.utils import import_string
+
+__all__ = [
+    "CacheBackend",
+    "LRUCache",
+    "ResponseCache",
+    "response_cache",
+    "conditional_response",
+]
+
+# (body, status code, content type) of a cached response
+CachedResponse = Tuple[bytes, int, Optional[str]]
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the storage used by `ResponseCache`.
+
+    A backend shared between workers (e.g. redis) can be plugged in by subclassing this class
+    and setting its import path as the RESPONSE_CACHE_BACKEND config value.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Returns the cached response stored under `key` (None if missing or expired).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse, ttl: Optional[int] = None):
+        """
+        Stores a response under `key` for `ttl` seconds (forever if None).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str):
+        """
+        Deletes every response whose key starts with `prefix`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        """
+        Deletes every cached response.
+        """
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    Thread safe in-process cache that evicts the least recently used entry once full.
+
+    Attributes:
+        max_entries (int): Maximum amount of cached responses.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[Optional[float], CachedResponse]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+
+            if expires_at is not None and expires_at <= monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, ttl: Optional[int] = None):
+        expires_at = monotonic() + ttl if ttl else None
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache:
+    """
+    Caches the successful responses of read endpoints until the data behind them is changed.
+
+    Responses are keyed by a namespace, an optional scope (the value of one request argument)
+    and the full request path, so writes can invalidate either a whole namespace or a single scope
+    of it (e.g. one blog post). Handlers that change data must call `invalidate` for what they changed.
+
+    The default backend is per process, so with several workers the RESPONSE_CACHE_TTL bounds how long
+    the other workers may serve a stale response.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend
+        self.enabled = True
+        self.ttl: Optional[int] = None
+
+    def init_app(self, app: Flask, backend: Optional[CacheBackend] = None):
+        """
+        Configures the cache from the app config.
+
+        Args:
+            app (Flask): The app.
+            backend (Optional[CacheBackend]): Backend to use instead of the configured one.
+        """
+        self.enabled = app.config.get("RESPONSE_CACHE_ENABLED", True)
+        self.ttl = app.config.get("RESPONSE_CACHE_TTL")
+
+        if backend is not None:
+            self.backend = backend
+        elif app.config.get("RESPONSE_CACHE_BACKEND"):
+            self.backend = import_string(app.config["RESPONSE_CACHE_BACKEND"])()
+        else:
+            self.backend = LRUCache(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 512))
+
+    @staticmethod
+    def _prefix(namespace: str, scope: Any = None) -> str:
+        return namespace if scope is None else f"{namespace}:{scope}"
+
+    def cached(self, namespace: str, scope_arg: Optional[str] = None) -> Callable:
+        """
+        Decorator caching the successful responses of a view.
+
+        Args:
+            namespace (str): Namespace invalidated by the handlers changing the view's data.
+            scope_arg (Optional[str]): Request argument narrowing the namespace (e.g. "id").
+
+        Returns:
+            Callable: The decorator.
+        """
+
+        def decorator(view: Callable) -> Callable:
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or self.backend is None:
+                    return view(*args, **kwargs)
+
+                scope = request.args.get(scope_arg) if scope_arg else None
+                query = "&".join(
+                    f"{key}={value}"
+                    for key, value in sorted(request.args.items(multi=True))
+                )
+                key = f"{self._prefix(namespace, scope)}|{request.path}?{query}"
+
+                hit = self.backend.get(key)
+
+                if hit is not None:
+                    body, status, content_type = hit
+                    return Response(body, status, content_type=content_type)
+
+                res = make_response(view(*args, **kwargs))
+
+                if res.status_code == 200 and not res.is_streamed:
+                    self.backend.set(
+                        key,
+                        (res.get_data(), res.status_code, res.content_type),
+                        self.ttl,
+                    )
+                return res
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, *namespaces: str, scope: Any = None):
+        """
+        Drops the cached responses of the given namespaces.
+
+        Args:
+            *namespaces (str): The namespaces to drop.
+            scope (Any): Only drop the responses of this scope of the namespaces.
+        """
+        if self.backend is None:
+            return
+
+        for namespace in namespaces:
+            self.backend.delete_prefix(f"{self._prefix(namespace, scope)}|")
+
+    def clear(self):
+        """
+        Drops every cached response.
+        """
+        if self.backend is not None:
+            self.backend.clear()
+
+
+response_cache = ResponseCache()
+
+
+def conditional_response(view: Callable) -> Callable:
+    """
+    Decorator adding a content hash ETag and a Cache-Control header to the successful responses of a view.
+
+    Requests whose If-None-Match header matches the ETag are answered with an empty 304 response.
+    The max-age of the Cache-Control header is the HTTP_CACHE_MAX_AGE config value; with a max-age of 0
+    clients revalidate every request, which stays cheap as unchanged payloads are not sent again.
+    Authenticated and `edit` requests may see drafts, so their responses are marked private and always revalidated.
+
+    Args:
+        view (Callable): The view to decorate.
+
+    Returns:
+        Callable: The decorated view.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        res = make_response(view(*args, **kwargs))
+
+        if res.status_code != 200 or res.is_streamed:
+            return res
+
+        max_age = current_app.config.get("HTTP_CACHE_MAX_AGE", 0)
+        res.add_etag()
+        res.vary.add("Authorization")
+
+        if "Authorization" in request.headers or "edit" in request.args:
+            res.cache_control.private = True
+            res.cache_control.no_cache = True
+            return res.make_conditional(request)
+
+        res.cache_control.public = True
+        res.cache_control.max_age = max_age
+
+        if not max_age:
+            res.cache_control.no_cache = True
+        return res.make_conditional(request)
+
+    return wrapper
@@ -1,36 +1,65 @@
 """
 This module provides functions for interacting with a Content Delivery Network (CDN) to upload, patch, and delete images.
 
-It uses the imagekit API to perform these operations.
+It calls the imagekit API through the shared HTTP client to perform these operations.
+Uploaded images are tracked by the SHA-256 of their content in the image_asset table: uploading an image
+that is already on the CDN reuses it (adding a reference) and deleting an image only reaches the CDN
+once its last reference is gone.
+The image_asset rows are changed in their own short transactions, independent of the request's session.
 
 Functions:
 - upload_image: Uploads an image to the CDN.
 - patch_image: Patches an image in the CDN with a new image.
 - delete_image: Deletes an image from the CDN.
+- acquire_image: Adds a reference to an uploaded image.
+- release_images: Releases references to uploaded images, logging the failures.
+- upload_blog_images: Concurrently uploads the images of a blog post to the CDN.
+- blog_image_ids: Returns the CDN ids of the images of a blog post.
+- diff_blog_images: Finds the added, replaced and removed images of an edited blog post.
+- patch_blog_images: Concurrently uploads the added and replaced images of an edited blog post.
+- delete_blog_images: Deletes the images of a blog post from the CDN.
+
+Classes:
+- ImageTooLargeError: Raised for images larger than the maximum upload size.
 """
 
 import base64
+import binascii
+import hashlib
 import os
+import shutil
 import uuid
-from io import BytesIO
-from typing import Any, Optional, Tuple, Union
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Iterable, Optional, Tuple, Union
 from urllib.parse import urlparse
-from flask import current_app
+from flask import current_app, Flask
 
-import requests
-import certifi
 from dotenv import load_dotenv
-from imagekitio import ImageKit
-from imagekitio.models.UploadFileRequestOptions import UploadFileRequestOptions
+from requests_toolbelt import MultipartEncoder
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
+from app import db
+from models import ImageAsset
+from utils.http import http_client
+
 __all__ = [
+    "ImageTooLargeError",
     "upload_image",
     "patch_image",
     "delete_image",
+    "acquire_image",
+    "release_images",
     "upload_blog_images",
+    "blog_image_ids",
     "delete_blog_images",
+    "diff_blog_images",
     "patch_blog_images",
 ]
 
@@ -41,6 +70,8 @@ PUBLIC_KEY = os.getenv("IMGKIT_PUBLIC_KEY")
 PRIVATE_KEY = os.getenv("IMGKIT_PRIVATE_KEY")
 IMGKIT_ID = os.getenv("IMGKIT_ID")
 URL_ENDPOINT = f"https://ik.imagekit.io/{IMGKIT_ID}/"
+UPLOAD_URL = "https://upload.imagekit.io/api/v1/files/upload"
+FILES_URL = "https://api.imagekit.io/v1/files"
 
 mime_to_extension = {
     "image/jpeg": "jpg",
@@ -55,9 +86,13 @@ mime_to_extension = {
     "image/heic": ".heic",
 }
 
-imgkit = ImageKit(
-    private_key=PRIVATE_KEY, public_key=PUBLIC_KEY, url_endpoint=URL_ENDPOINT
-)
+
+def _auth_headers() -> dict[str, str]:
+    """
+    internal function that returns the headers authenticating a request to the ImageKit API
+    """
+    token = base64.b64encode(f"{PRIVATE_KEY}:".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
 
 
 def get_file_extension(mime_type):
@@ -65,12 +100,89 @@ def get_file_extension(mime_type):
     return extension if extension else "bin"
 
 
+class ImageTooLargeError(ValueError):
+    """
+    Raised when an image is larger than the CDN_MAX_UPLOAD_SIZE config value (it is never sent to the CDN).
+    """
+
+
+def _stream_size(stream: IO[bytes]) -> int:
+    """
+    internal function that returns the size of a seekable stream and rewinds it
+    """
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+
+    return size
+
+
+def _stream_sha256(stream: IO[bytes]) -> str:
+    """
+    internal function that returns the hex SHA-256 digest of a seekable stream and rewinds it
+    """
+    digest = hashlib.sha256()
+
+    for chunk in iter(lambda: stream.read(64 * 1024), b""):
+        digest.update(chunk)
+
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _acquire_asset(sha256: str) -> Optional[Tuple[str, str]]:
+    """
+    internal function that adds a reference to the uploaded image with the given digest
+
+    Returns the url and id of the image, None if no such image was uploaded yet.
+    """
+    with Session(db.engine) as session:
+        row = session.execute(
+            update(ImageAsset)
+            .where(ImageAsset.sha256 == sha256)
+            .values(refcount=ImageAsset.refcount + 1)
+            .returning(ImageAsset.url, ImageAsset.file_id)
+        ).first()
+        session.commit()
+
+    return (row.url, row.file_id) if row else None
+
+
+def _register_asset(sha256: str, url: str, file_id: str) -> Tuple[str, str]:
+    """
+    internal function that records a freshly uploaded image
+
+    If the same image was uploaded concurrently and recorded first, the fresh upload is deleted
+    again and the url and id of the recorded one are returned instead.
+    """
+    stmt = insert(ImageAsset).values(
+        sha256=sha256, url=url, file_id=file_id, refcount=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ImageAsset.sha256],
+        set_={"refcount": ImageAsset.refcount + 1},
+    ).returning(ImageAsset.url, ImageAsset.file_id)
+
+    with Session(db.engine) as session:
+        row = session.execute(stmt).one()
+        session.commit()
+
+    if row.file_id != file_id:
+        _delete_file(file_id)
+
+    return row.url, row.file_id
+
+
 def upload_image(
     image: FileStorage, name: str, tag: Optional[str] = None
 ) -> Union[Tuple[str, str], bool]:
     """
     Uploads an image to the CDN using the provided image file, name, and return type.
 
+    The image is sent as a multipart upload streamed from the file's stream, so the image is never
+    held in memory as a whole. Images whose content is already on the CDN are not uploaded again
+    (the existing one is returned).
+
     Args:
         image (FileStorage): The image file to be uploaded.
         name (str): The name of the image file.
@@ -78,32 +190,48 @@ def upload_image(
     Returns:
         Union[Tuple[str, str], bool]: A tuple containing the image URL and ID if the upload is successful,
         otherwise False.
+
+    Raises:
+        ImageTooLargeError: If the image is larger than the CDN_MAX_UPLOAD_SIZE config value.
     """
+    stream = image.stream
+
+    # unseekable streams (e.g. a raw socket) are spooled first to get their size
+    if not stream.seekable():
+        spool = SpooledTemporaryFile(max_size=current_app.config["CDN_SPOOL_SIZE"])
+        shutil.copyfileobj(stream, spool)
+        stream = spool
+
+    if _stream_size(stream) > current_app.config["CDN_MAX_UPLOAD_SIZE"]:
+        raise ImageTooLargeError("The image is larger than the maximum upload size")
+
+    sha256 = _stream_sha256(stream)
+    asset = _acquire_asset(sha256)
+
+    if asset is not None:
+        return asset
+
     # construct request
-    options = UploadFileRequestOptions(
-        use_unique_file_name=True,
-        tags=[tag if tag else "education"],
-        folder="/imgs/" if not current_app.config["TESTING"] else "/testing/",
-        is_private_file=False,
-        is_published=True,
+    form = MultipartEncoder(
+        fields={
+            "file": (name, stream, image.mimetype or "application/octet-stream"),
+            "fileName": name,
+            "useUniqueFileName": "true",
+            "tags": tag if tag else "education",
+            "folder": "/imgs/" if not current_app.config["TESTING"] else "/testing/",
+            "isPrivateFile": "false",
+            "isPublished": "true",
+        }
     )
-
-    stream = base64.b64encode(image.stream.read())
+    headers = _auth_headers()
+    headers["Content-Type"] = form.content_type
 
     # Make request
-    res = imgkit.upload_file(
-        file=stream,
-        file_name=name,
-        options=options,
-    )
+    res = http_client.request("POST", UPLOAD_URL, data=form, headers=headers)
 
-    if res.response_metadata.http_status_code == 200:
-        img_id = res.file_id
-        img_url = res.url
-        return (
-            img_url,
-            img_id,
-        )
+    if res.status_code == 200:
+        body = res.json()
+        return _register_asset(sha256, body["url"], body["fileId"])
     else:
         return False
 
@@ -122,126 +250,451 @@ def patch_image(
     Returns:
         Union[Tuple[str, str], bool]: A tuple containing the new URL and ID of the patched image if successful,
         otherwise False.
-    """
-    # delete image
-    res = delete_image(img_id)
-
-    if not res:
-        return False
 
-    # reupload image
+    Raises:
+        ImageTooLargeError: If the new image is larger than the CDN_MAX_UPLOAD_SIZE config value.
+    """
+    # upload the new image first, so a rejected image (e.g. too large) keeps the old one
     if not tag:
         res = upload_image(new_img, new_name)
     else:
         res = upload_image(new_img, new_name, tag)
 
-    if res:
-        return (
-            res[0],
-            res[1],
-        )
-    else:
+    if not res:
+        return False
+
+    # delete old image
+    if not delete_image(img_id):
+        delete_image(res[1])
         return False
 
+    return (
+        res[0],
+        res[1],
+    )
+
+
+def _delete_file(img_id: str) -> bool:
+    """
+    internal function that deletes a file from the CDN (a file that is already gone counts as deleted)
+    """
+    res = http_client.request(
+        "DELETE", f"{FILES_URL}/{img_id}", headers=_auth_headers()
+    )
+
+    return res.status_code in (204, 404)
+
+
+def acquire_image(img_id: str) -> bool:
+    """
+    Adds a reference to an uploaded image (e.g. for another record showing the same image).
+
+    Args:
+        img_id (str): The ID of the image.
+
+    Returns:
+        bool: True if the reference was added, False if the image is not tracked (uploaded before images were tracked).
+    """
+    with Session(db.engine) as session:
+        row = session.execute(
+            update(ImageAsset)
+            .where(ImageAsset.file_id == img_id)
+            .values(refcount=ImageAsset.refcount + 1)
+            .returning(ImageAsset.file_id)
+        ).first()
+        session.commit()
+
+    return row is not None
+
 
 def delete_image(img_id: str) -> bool:
     """
     Deletes an image from the CDN.
 
+    Only a reference is dropped while other records still use the image, the file itself is
+    deleted with the last reference (images uploaded before they were tracked are deleted directly).
+
     Args:
         img_id (str): The ID of the image to be deleted.
 
     Returns:
         bool: True if the image was successfully deleted, False otherwise.
     """
+    with Session(db.engine) as session:
+        row = session.execute(
+            update(ImageAsset)
+            .where(ImageAsset.file_id == img_id)
+            .values(refcount=ImageAsset.refcount - 1)
+            .returning(ImageAsset.refcount)
+        ).first()
 
-    # make request
-    res = imgkit.delete_file(img_id)
+        if row is not None and row.refcount > 0:
+            session.commit()
+            return True
 
-    if res.response_metadata.http_status_code == 204:
-        return True
-    return False
+        if row is not None:
+            session.execute(delete(ImageAsset).where(ImageAsset.file_id == img_id))
 
+        # the row stays locked until the file is deleted, so the image can not be reused meanwhile
+        if not _delete_file(img_id):
+            session.rollback()
+            return False
 
-def upload_blog_images(data: list[dict[Any, str]]) -> list[dict[Any, str]] | int:
+        session.commit()
+
+    return True
+
+
+def release_images(img_ids: Iterable[str]) -> bool:
     """
-    Uploads blog images to a CDN or saves them locally.
+    Releases one reference of each given image (see `delete_image`), for cleanups that must not stop halfway.
+
+    A failing release is logged and the remaining images are still released.
+
     Args:
-        data (List[Dict[Any, str]]): A list of dictionaries containing image data.
+        img_ids (Iterable[str]): The IDs of the images, once per reference to release.
+
     Returns:
-        List[Dict[Any, str]] | int: The modified list of dictionaries with updated image URLs and IDs, or an integer indicating an error.
+        bool: True if every reference was released, False otherwise.
     """
-    # temp val until CDN service is running
-    img_id = 1
-    for row in data:
-        if row["type"] == "img":
-            img_url = urlparse(row["url"])
+    released = True
 
-            if all([img_url.scheme, img_url.netloc]):
-                res = requests.get(
-                    img_url.geturl(), stream=True, verify=certifi.where()
-                )
+    for img_id in img_ids:
+        try:
+            ok = delete_image(img_id)
+        except Exception:
+            current_app.logger.exception("Image %s could not be released", img_id)
+            ok = False
+        else:
+            if not ok:
+                current_app.logger.warning("Image %s could not be released", img_id)
+
+        released = released and ok
+
+    return released
+
+
+def _read_image(url: str, timeout: float) -> IO[bytes]:
+    """
+    internal function that returns a blog image url as a temporary file
+
+    The file is kept in memory up to CDN_SPOOL_SIZE and spooled to disk past it.
+    """
+    max_size = current_app.config["CDN_MAX_UPLOAD_SIZE"]
 
-                if res.status_code == 200:
-                    image = FileStorage(BytesIO(res.content))
-
-                    image_name = secure_filename(f"image_{uuid.uuid4().hex}.png")
-
-                    imgkit_url, img_id = upload_image(image, image_name, "blog")
-                    row["url"] = imgkit_url
-                    row["id"] = img_id
-                else:
-                    continue
-            else:
-                image = FileStorage(BytesIO(bytes(row["url"])))
-                image_name = secure_filename(f"image_{uuid.uuid4().hex}.png")
-                imgkit_url, img_id = upload_image(image, image_name, "blog")
-                row["url"] = imgkit_url
-                row["id"] = img_id
-    return data
-
-
-def patch_blog_images(data: list[dict[Any, str]]) -> list[dict[Any, str]]:
-    for row in data:
-        if row["type"] == "img":
-            img_id = row["id"]
-            img_url = urlparse(row["url"])
-
-            if all([img_url.scheme, img_url.netloc]):
-                res = requests.get(
-                    img_url.geturl(), stream=True, verify=certifi.where()
+    if not isinstance(url, str):
+        raise ValueError("The image has no url")
+
+    spool = SpooledTemporaryFile(max_size=current_app.config["CDN_SPOOL_SIZE"])
+
+    try:
+        _spool_image(url, spool, max_size, timeout)
+    except Exception:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return spool
+
+
+def _spool_image(url: str, spool: IO[bytes], max_size: int, timeout: float):
+    """
+    internal function that writes the image of a url into `spool`
+
+    Images are either remote (http(s) urls, downloaded in chunks) or pasted into the editor
+    (base64 data urls). Images larger than `max_size` are rejected as soon as they are,
+    before the CDN is touched.
+    """
+    if url.startswith("data:"):
+        header, _, payload = url.partition(",")
+
+        if not header.endswith(";base64"):
+            raise ValueError("Only base64 encoded data urls are supported")
+
+        if len(payload) * 3 // 4 > max_size:
+            raise ImageTooLargeError("The image is larger than the maximum upload size")
+
+        try:
+            spool.write(base64.b64decode(payload, validate=True))
+        except binascii.Error as err:
+            raise ValueError("The data url is not valid base64") from err
+
+        return
+
+    img_url = urlparse(url)
+
+    if img_url.scheme not in ("http", "https") or not img_url.netloc:
+        raise ValueError("The image url is not a valid url")
+
+    with http_client.get(img_url.geturl(), timeout=timeout, stream=True) as res:
+        res.raise_for_status()
+
+        if int(res.headers.get("Content-Length") or 0) > max_size:
+            raise ImageTooLargeError("The image is larger than the maximum upload size")
+
+        for chunk in res.iter_content(chunk_size=64 * 1024):
+            spool.write(chunk)
+
+            if spool.tell() > max_size:
+                raise ImageTooLargeError(
+                    "The image is larger than the maximum upload size"
                 )
 
-                if res.status_code == 200:
-                    image = FileStorage(BytesIO(res.content))
-                    image_name = secure_filename(f"image_{uuid.uuid4().hex}.png")
 
-                    imgkit_url, img_id = patch_image(image, image_name, img_id, "blog")
-                    row["url"] = imgkit_url
-                    row["id"] = img_id
-            else:
-                image = FileStorage(BytesIO(bytes(row["url"])))
-                image_name = secure_filename(f"image_{uuid.uuid4().hex}.png")
+def _transfer_image(app: Flask, url: str, timeout: float) -> Tuple[str, str]:
+    """
+    internal function that uploads a single blog image to the CDN
+
+    Runs in a worker thread, so it pushes its own app context for the CDN helpers.
+    """
+    with app.app_context():
+        image_name = secure_filename(f"image_{uuid.uuid4().hex}.png")
+
+        with _read_image(url, timeout) as stream:
+            res = upload_image(FileStorage(stream, image_name), image_name, "blog")
+
+        if not res:
+            raise RuntimeError("The CDN did not accept the image")
+
+        return res
+
+
+def _release_late_image(app: Flask, future: Future):
+    """
+    internal function that releases a blog image uploaded after its post was given up on
+
+    Runs as the done callback of the upload, so it pushes its own app context.
+    """
+    if future.cancelled() or future.exception() is not None:
+        return
+
+    with app.app_context():
+        release_images([future.result()[1]])
+
+
+def _image_nodes(data: Any) -> list[int]:
+    """
+    internal function that returns the indexes of the img nodes of a Plate tree
+    """
+    if not isinstance(data, list):
+        return []
+
+    return [
+        i
+        for i, row in enumerate(data)
+        if isinstance(row, dict) and row.get("type") == "img"
+    ]
+
+
+def blog_image_ids(data: list[dict[str, Any]]) -> list[str]:
+    """
+    Returns the CDN ids of the img nodes of a Plate tree (once per node, as every node holds a reference).
+
+    Args:
+        data (list[dict[str, Any]]): The Plate editor tree of the blog post.
+
+    Returns:
+        list[str]: The CDN ids of the images.
+    """
+    return [data[i]["id"] for i in _image_nodes(data) if data[i].get("id")]
+
+
+def _transfer_blog_images(
+    data: list[dict[str, Any]],
+    nodes: list[int],
+    max_workers: int,
+    timeout: float,
+    deadline: float,
+) -> Tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    internal function that concurrently uploads the given img nodes of a Plate tree to the CDN
+
+    Returns the tree with the CDN urls and ids of the uploaded images and the failures.
+    If any image fails, the images uploaded by the call are deleted again (including the ones
+    still uploading at the deadline, once they finish).
+    """
+    if not nodes:
+        return data, []
+
+    app = current_app._get_current_object()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    futures = {
+        executor.submit(_transfer_image, app, data[i].get("url"), timeout): i
+        for i in nodes
+    }
+    results: dict[int, Tuple[str, str]] = {}
+    errors: dict[int, str] = {}
+
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            i = futures[future]
+
+            try:
+                results[i] = future.result()
+            except Exception as err:
+                errors[i] = str(err) or err.__class__.__name__
+    except TimeoutError:
+        pass
+
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    failures = [
+        {
+            "index": i,
+            "error": errors.get(i, "Upload did not finish before the upload deadline"),
+        }
+        for i in nodes
+        if i not in results
+    ]
+
+    if failures:
+        release_images(res[1] for res in results.values())
+
+        # uploads still running at the deadline are released once they finish
+        for future, i in futures.items():
+            if i not in results and i not in errors:
+                future.add_done_callback(partial(_release_late_image, app))
+
+        return data, failures
+
+    for i, (url, img_id) in results.items():
+        data[i]["url"], data[i]["id"] = url, img_id
+
+    return data, failures
+
+
+def upload_blog_images(
+    data: list[dict[str, Any]],
+    max_workers: int = 4,
+    timeout: float = 30,
+    deadline: float = 60,
+) -> Tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Concurrently uploads the images of a blog post (its img nodes) to the CDN.
+
+    The images are downloaded (or decoded from their data url) and uploaded by a bounded pool of workers,
+    the CDN url and id of each image are written back into its own node, so the order of the tree is kept.
+    If any image fails, the images uploaded by the call are deleted again, so a failed post leaves
+    nothing behind on the CDN.
+
+    Args:
+        data (list[dict[str, Any]]): The Plate editor tree of the blog post.
+        max_workers (int): Maximum amount of images transferred at the same time.
+        timeout (float): Timeout in seconds of a single image download.
+        deadline (float): Seconds after which images that are still not uploaded are reported as failed.
+
+    Returns:
+        Tuple[list[dict[str, Any]], list[dict[str, Any]]]: The tree with the CDN urls and ids of the images
+        and the failures (the "index" of the node and the "error"), empty if every image was uploaded.
+    """
+    return _transfer_blog_images(
+        data, _image_nodes(data), max_workers, timeout, deadline
+    )
+
+
+def diff_blog_images(
+    old_data: list[dict[str, Any]], data: list[dict[str, Any]]
+) -> Tuple[list[int], list[int], list[str]]:
+    """
+    Compares the images of the stored and the edited Plate tree of a blog post.
+
+    Every img node holds one reference to its CDN image, so the images are compared per node:
+    an img node of the edited tree is unchanged if it still has the CDN id and url it was stored with
+    and a stored node of that image is left to match it. Extra nodes of a stored image (e.g. a copy-pasted
+    image) need a reference of their own, every other img node (added, or its image replaced) has to be
+    uploaded, and each stored node left unmatched releases its reference.
+
+    Args:
+        old_data (list[dict[str, Any]]): The stored Plate editor tree of the blog post.
+        data (list[dict[str, Any]]): The edited Plate editor tree of the blog post.
+
+    Returns:
+        Tuple[list[int], list[int], list[str]]: The indexes of the img nodes of `data` to upload, the indexes
+        of the img nodes of `data` that need another reference to a stored image, and the CDN ids of the
+        released references (once per released reference).
+    """
+    urls = {}
+    available = Counter()
+
+    for i in _image_nodes(old_data):
+        img_id = old_data[i].get("id")
+
+        if img_id:
+            urls[img_id] = old_data[i].get("url")
+            available[img_id] += 1
+
+    changed = []
+    copied = []
+
+    for i in _image_nodes(data):
+        img_id = data[i].get("id")
 
-                imgkit_url, img_id = patch_image(image, image_name, img_id, "blog")
-                row["url"] = imgkit_url
-                row["id"] = img_id
-    return data
+        if img_id not in urls or urls[img_id] != data[i].get("url"):
+            changed.append(i)
+        elif available[img_id] > 0:
+            available[img_id] -= 1
+        else:
+            copied.append(i)
+
+    return changed, copied, list(available.elements())
+
+
+def patch_blog_images(
+    old_data: list[dict[str, Any]],
+    data: list[dict[str, Any]],
+    max_workers: int = 4,
+    timeout: float = 30,
+    deadline: float = 60,
+) -> Tuple[list[dict[str, Any]], list[dict[str, Any]], list[str], list[str]]:
+    """
+    Concurrently uploads the added and replaced images of an edited blog post to the CDN.
+
+    Only the img nodes found by `diff_blog_images` are uploaded (like `upload_blog_images` does),
+    unchanged images are not transferred at all and copies of a stored image only take another reference
+    (images uploaded before they were tracked are uploaded again instead). The released references are
+    returned instead of released, so the caller can release them once the edited post is saved, along with
+    the references taken, which the caller must release if the edited post is not saved.
+
+    Args:
+        old_data (list[dict[str, Any]]): The stored Plate editor tree of the blog post.
+        data (list[dict[str, Any]]): The edited Plate editor tree of the blog post.
+        max_workers (int): Maximum amount of images transferred at the same time.
+        timeout (float): Timeout in seconds of a single image download.
+        deadline (float): Seconds after which images that are still not uploaded are reported as failed.
+
+    Returns:
+        Tuple[list[dict[str, Any]], list[dict[str, Any]], list[str], list[str]]: The edited tree with the CDN urls
+        and ids of the uploaded images, the failures (the "index" of the node and the "error"), the CDN ids of
+        the taken references and the CDN ids of the released references (both once per reference).
+    """
+    changed, copied, removed = diff_blog_images(old_data, data)
+    acquired = []
+
+    for i in copied:
+        if acquire_image(data[i]["id"]):
+            acquired.append(data[i]["id"])
+        else:
+            changed.append(i)
+
+    changed.sort()
+    data, failures = _transfer_blog_images(
+        data, changed, max_workers, timeout, deadline
+    )
+
+    if failures:
+        release_images(acquired)
+        return data, failures, [], []
+
+    return data, failures, acquired + [data[i]["id"] for i in changed], removed
 
 
 def delete_blog_images(data: list[dict[Any, str]]) -> bool:
     """
-    Deletes blog images from the CDN.
+    Deletes blog images from the CDN (releases one reference per img node, see `release_images`).
     Args:
         data (List[Dict[Any, str]]): A list of dictionaries containing information about the images.
     Returns:
         bool: True if all images were successfully deleted, False otherwise.
     """
-    for row in data:
-        if row["type"] == "img":
-            img_id = row["id"]
-            res = delete_image(img_id)
-
-            if not res:
-                return False
-    return True
+    return release_images(blog_image_ids(data))
@@ -0,0 +1,161 @@
+"""
+This module contains the shared HTTP client used by every outbound request of the backend
+(link checks, blog image downloads and the CDN API).
+
+The client keeps one keep-alive connection pool per host, so repeated requests to the same host
+reuse their connections instead of opening a new TCP and TLS connection each time. Idempotent
+requests that fail to connect or get a transient error status are retried with an exponential backoff
+(or after the Retry-After of the response, capped at `MAX_RETRY_AFTER` seconds).
+
+Classes:
+- CappedRetry: Retry configuration with an upper bound on the Retry-After wait.
+- HttpClient: Thread safe HTTP client with per host connection pools, retries and default timeouts.
+"""
+
+import threading
+from typing import Any, Optional, Tuple
+
+import certifi
+import requests
+from flask import Flask
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+__all__ = [
+    "CappedRetry",
+    "HttpClient",
+    "http_client",
+]
+
+# statuses worth retrying: rate limiting and transient gateway errors
+RETRY_STATUSES = (429, 502, 503, 504)
+# longest Retry-After in seconds a request waits for, so a rate limited host can not stall a worker
+MAX_RETRY_AFTER = 5
+
+
+class CappedRetry(Retry):
+    """
+    Retry configuration honoring the Retry-After header for at most `MAX_RETRY_AFTER` seconds.
+    """
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+class HttpClient:
+    """
+    Thread safe HTTP client sharing one `requests.Session` between every caller and thread.
+
+    The session is built lazily from the HTTP_* config values set by `init_app`. Only idempotent
+    methods (GET, HEAD, PUT, DELETE, OPTIONS) are retried, so uploads are never sent twice.
+
+    Attributes:
+        pool_connections (int): Amount of hosts whose connection pool is kept open.
+        pool_maxsize (int): Maximum amount of open connections per host.
+        retries (int): Maximum amount of retries of an idempotent request.
+        backoff_factor (float): Backoff factor of the retries (0, 2, 4, ... times this many seconds).
+        timeout (Tuple[float, float]): Default (connect, read) timeout in seconds.
+    """
+
+    def __init__(self):
+        self.pool_connections = 10
+        self.pool_maxsize = 10
+        self.retries = 2
+        self.backoff_factor = 0.3
+        self.timeout: Tuple[float, float] = (5, 30)
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask):
+        """
+        Configures the client from the app config.
+
+        Args:
+            app (Flask): The app.
+        """
+        self.pool_connections = app.config.get("HTTP_POOL_CONNECTIONS", 10)
+        self.pool_maxsize = app.config.get("HTTP_POOL_MAXSIZE", 10)
+        self.retries = app.config.get("HTTP_RETRIES", 2)
+        self.backoff_factor = app.config.get("HTTP_BACKOFF_FACTOR", 0.3)
+        self.timeout = (
+            app.config.get("HTTP_CONNECT_TIMEOUT", 5),
+            app.config.get("HTTP_READ_TIMEOUT", 30),
+        )
+        self.close()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The shared session, created on first use.
+        """
+        with self._lock:
+            if self._session is None:
+                retry = CappedRetry(
+                    total=self.retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=RETRY_STATUSES,
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=retry,
+                )
+
+                session = requests.Session()
+                session.verify = certifi.where()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def request(
+        self, method: str, url: str, timeout: Any = None, **kwargs
+    ) -> requests.Response:
+        """
+        Sends a request through the shared session.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The url to request.
+            timeout (Any): Timeout in seconds, or a (connect, read) tuple (the configured timeout if None).
+            **kwargs: Passed on to `requests.Session.request`.
+
+        Returns:
+            requests.Response: The response.
+
+        Raises:
+            requests.RequestException: If the request failed after its retries.
+        """
+        return self.session.request(
+            method, url, timeout=timeout or self.timeout, **kwargs
+        )
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request, see `request`.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a HEAD request, see `request`.
+        """
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        """
+        Closes the open connections, the next request opens new ones.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+http_client = HttpClient()
@@ -0,0 +1,539 @@
+"""
+This module provides functions for inspecting the links stored in the database.
+
+All urls are read from the database first and the database session is closed before
+any network I/O starts. The links are then checked concurrently by a bounded thread pool
+that reuses one HTTP connection pool per host (the shared `utils.http` client) and gives up
+once a global deadline is reached.
+Inspections can also run as background jobs whose progress and partial results can be polled.
+Link statuses are cached per url in the database so repeated inspections only check
+links whose cached status expired.
+
+Functions:
+- collect_links: Reads every url stored in the tables containing urls.
+- check_links: Concurrently checks the given links and reports on their validity and status.
+- inspect_links: Concurrently checks every stored link and reports on its validity and status.
+
+Classes:
+- LinkStatusCache: Persistent cache of link statuses keyed by url.
+- LinkInspectionJob: A link inspection running in the background.
+- LinkInspectionJobs: Runs link inspection jobs on an in-process worker pool.
+"""
+
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional, Tuple
+
+import pendulum
+import requests
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import LinkStatus
+from utils.http import http_client
+from utils.sql import get_table_columns
+
+__all__ = [
+    "collect_links",
+    "check_links",
+    "inspect_links",
+    "LinkStatusCache",
+    "LinkInspectionJob",
+    "LinkInspectionJobs",
+    "link_jobs",
+]
+
+URL_TABLES = ["cert_and_license", "course", "education", "project_post"]
+
+
+def collect_links(engine: Engine) -> List[Tuple[str, int, str]]:
+    """
+    Reads every non null url stored in the tables containing urls.
+
+    Args:
+        engine (Engine): SQLAlchemy Engine instance to connect to the database.
+
+    Returns:
+        List[Tuple[str, int, str]]: A list of (tablename, item_id, link) tuples ordered by table and column.
+    """
+    links = []
+
+    with Session(engine) as session:
+        for tablename in URL_TABLES:
+            for column in get_table_columns(engine, tablename):
+                if column["name"].find("url") == -1:
+                    continue
+
+                rows = session.execute(
+                    text(
+                        f"SELECT id, {column['name']} FROM {tablename} WHERE {column['name']} IS NOT NULL"
+                    )
+                ).fetchall()
+
+                links.extend((tablename, row[0], row[1]) for row in rows)
+    return links
+
+
+def _link_report(
+    tablename: str, item_id: int, link: str, validity: bool | str, http_code: int
+) -> dict[str, Any]:
+    return {
+        "tablename": tablename,
+        "item_id": item_id,
+        "link": link,
+        "validity": validity,
+        "http_code": http_code,
+    }
+
+
+class LinkStatusCache:
+    """
+    Persistent cache of link statuses keyed by url, backed by the link_status table.
+
+    Statuses checked within the last `ttl` seconds are reused as is. Older statuses keep
+    their ETag/Last-Modified validators so the link can be revalidated with a conditional request.
+    """
+
+    def __init__(self, engine: Engine, ttl: float):
+        self._engine = engine
+        self._ttl = ttl
+        self._statuses: dict[str, dict[str, Any]] = {}
+        self._dirty: set[str] = set()
+        self._lock = threading.Lock()
+
+    def load(self, urls: List[str]):
+        """
+        Loads the cached statuses of the given urls in a single query.
+
+        Args:
+            urls (List[str]): The urls to load.
+        """
+        with Session(self._engine) as session:
+            rows = session.execute(
+                select(LinkStatus).where(LinkStatus.url.in_(urls))
+            ).scalars()
+
+            self._statuses = {
+                row.url: {
+                    "validity": row.validity,
+                    "http_code": row.http_code,
+                    "etag": row.etag,
+                    "last_modified": row.last_modified,
+                    "checked_at": row.checked_at,
+                }
+                for row in rows
+            }
+
+    def get(self, url: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            return self._statuses.get(url)
+
+    def is_fresh(self, url: str) -> bool:
+        status = self.get(url)
+
+        if status is None:
+            return False
+        return (pendulum.now("UTC") - status["checked_at"]).total_seconds() < self._ttl
+
+    def put(self, url: str, status: dict[str, Any]):
+        with self._lock:
+            self._statuses[url] = status
+            self._dirty.add(url)
+
+    def save(self):
+        """
+        Upserts every status checked since the cache was loaded in a single statement.
+        """
+        with self._lock:
+            rows = [{"url": url, **self._statuses[url]} for url in self._dirty]
+            self._dirty.clear()
+
+        if not rows:
+            return
+
+        stmt = insert(LinkStatus).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LinkStatus.url],
+            set_={
+                column: stmt.excluded[column]
+                for column in (
+                    "validity",
+                    "http_code",
+                    "etag",
+                    "last_modified",
+                    "checked_at",
+                )
+            },
+        )
+
+        with Session(self._engine) as session:
+            session.execute(stmt)
+            session.commit()
+
+
+def _check_url(
+    url: str, timeout: float, cached: Optional[dict[str, Any]]
+) -> Tuple[dict[str, Any], bool]:
+    """
+    internal function that sends a (conditional) HEAD request to a single url
+
+    Returns the status of the url and if the status can be cached
+    (statuses of requests that never got a response are not cached).
+    """
+    headers = {}
+
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        res = http_client.head(url, headers=headers, timeout=timeout)
+    except requests.exceptions.Timeout:
+        return {"validity": False, "http_code": 500}, False
+    except requests.exceptions.SSLError:
+        return (
+            {
+                "validity": f"""SSLError has occurred. Please check CA version on Render else could be something different.
+                \n Error traceback dump: \n\n
+                {traceback.format_exc()}""",
+                "http_code": 503,
+            },
+            False,
+        )
+    except requests.exceptions.RequestException:
+        return {"validity": False, "http_code": 500}, False
+
+    if res.status_code == 304 and cached:
+        return {**cached, "checked_at": pendulum.now("UTC")}, True
+
+    if not res.ok:
+        if "Server" in res.headers:
+            if "AkamaiGHost" in res.headers["Server"]:
+                validity = "Validity check failed due to AkamaiGHost blocking"
+            elif "CF-RAY" in res.headers and "cloudflare" in res.headers["Server"]:
+                validity = "Validity check failed due to CloudFlare blocking"
+            else:
+                validity = "Validity check failed due to unknown firewall"
+        else:
+            validity = False
+    else:
+        validity = str(res.status_code).startswith("2")
+
+    return {
+        "validity": validity,
+        "http_code": res.status_code,
+        "etag": res.headers.get("ETag"),
+        "last_modified": res.headers.get("Last-Modified"),
+        "checked_at": pendulum.now("UTC"),
+    }, True
+
+
+def check_links(
+    links: List[Tuple[str, int, str]],
+    max_workers: int = 8,
+    timeout: float = 30,
+    deadline: float = 120,
+    on_result: Optional[Callable[[dict[str, Any]], None]] = None,
+    cache: Optional[LinkStatusCache] = None,
+) -> List[dict[str, Any]]:
+    """
+    Concurrently checks the given links and returns their validity and status.
+
+    A url shared by several rows is only checked once, and urls with a fresh status
+    in `cache` are not checked at all.
+
+    Args:
+        links (List[Tuple[str, int, str]]): The (tablename, item_id, link) tuples to check.
+        max_workers (int): Maximum amount of links checked at the same time.
+        timeout (float): Timeout in seconds of a single link check.
+        deadline (float): Seconds after which links that are still unchecked are reported as timed out.
+        on_result (Optional[Callable[[dict[str, Any]], None]]): Called with each link report as soon as it is ready.
+        cache (Optional[LinkStatusCache]): Loaded link status cache to reuse and update.
+
+    Returns:
+        List[dict[str, Any]]: The link reports in the same order as `links`.
+    """
+    if not links:
+        return []
+
+    results = [None] * len(links)
+    url_rows: dict[str, List[int]] = {}
+
+    for i, link in enumerate(links):
+        url_rows.setdefault(link[2], []).append(i)
+
+    def report(url: str, validity: bool | str, http_code: int):
+        for i in url_rows[url]:
+            results[i] = _link_report(*links[i][:2], url, validity, http_code)
+
+            if on_result:
+                on_result(results[i])
+
+    stale = []
+
+    for url in url_rows:
+        if cache and cache.is_fresh(url):
+            status = cache.get(url)
+            report(url, status["validity"], status["http_code"])
+        else:
+            stale.append(url)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    futures = {
+        executor.submit(
+            _check_url, url, timeout, cache.get(url) if cache else None
+        ): url
+        for url in stale
+    }
+
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            url = futures[future]
+            status, cacheable = future.result()
+
+            if cache and cacheable:
+                cache.put(url, status)
+
+            report(url, status["validity"], status["http_code"])
+    except TimeoutError:
+        pass
+
+    for url in stale:
+        if results[url_rows[url][0]] is None:
+            report(
+                url,
+                "Validity check did not finish before the inspection deadline",
+                504,
+            )
+
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def inspect_links(
+    engine: Engine,
+    max_workers: int = 8,
+    timeout: float = 30,
+    deadline: float = 120,
+    ttl: float = 3600,
+    links: Optional[List[Tuple[str, int, str]]] = None,
+    on_result: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> List[dict[str, Any]]:
+    """
+    Inspects links in the database tables and returns their validity and status.
+
+    Link statuses are cached by url in the link_status table: statuses checked within the last
+    `ttl` seconds are reused and older ones are revalidated with a conditional request.
+
+    Args:
+        engine (Engine): SQLAlchemy Engine instance to connect to the database.
+        max_workers (int): Maximum amount of links checked at the same time.
+        timeout (float): Timeout in seconds of a single link check.
+        deadline (float): Seconds after which links that are still unchecked are reported as timed out.
+        ttl (float): Seconds a cached link status is reused without checking the link again.
+        links (Optional[List[Tuple[str, int, str]]]): Links already read with `collect_links` (read from the database if omitted).
+        on_result (Optional[Callable[[dict[str, Any]], None]]): Called with each link report as soon as it is ready.
+
+    Returns:
+        List[dict[str, Any]]: A list of dictionaries, in database order, containing the following keys:
+            - tablename (str): The table the link is stored in.
+            - item_id (str): The ID of the item.
+            - link (str): The URL link.
+            - validity (bool): True if the link is valid (HTTP status code starts with '2'), False otherwise.
+            - http_code (int): The HTTP status code returned by the HEAD request.
+    """
+    if links is None:
+        links = collect_links(engine)
+
+    if not links:
+        return []
+
+    cache = LinkStatusCache(engine, ttl)
+    cache.load(list({link[2] for link in links}))
+
+    results = check_links(links, max_workers, timeout, deadline, on_result, cache)
+    cache.save()
+
+    return results
+
+
+class LinkInspectionJob:
+    """
+    A link inspection running in the background.
+
+    Reports are kept per (tablename, item_id, link) as soon as each link check finishes
+    so that the progress and partial results can be polled while the job is running.
+
+    Attributes:
+        id (str): Unique id of the job.
+        status (str): One of "pending", "running", "finished" or "failed".
+        created_at (str): Date and time the job was created.
+        finished_at (Optional[str]): Date and time the job finished (if finished).
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.created_at = pendulum.now().to_iso8601_string()
+        self.finished_at: Optional[str] = None
+        self._links: List[Tuple[str, int, str]] = []
+        self._reports: dict[Tuple[str, int, str], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        engine: Engine,
+        max_workers: int,
+        timeout: float,
+        deadline: float,
+        ttl: float,
+    ):
+        """
+        Collects and checks every stored link, recording each report as it finishes.
+
+        Args:
+            engine (Engine): SQLAlchemy Engine instance to connect to the database.
+            max_workers (int): Maximum amount of links checked at the same time.
+            timeout (float): Timeout in seconds of a single link check.
+            deadline (float): Seconds after which links that are still unchecked are reported as timed out.
+            ttl (float): Seconds a cached link status is reused without checking the link again.
+        """
+        try:
+            links = collect_links(engine)
+
+            with self._lock:
+                self._links = links
+                self.status = "running"
+
+            inspect_links(
+                engine,
+                max_workers,
+                timeout,
+                deadline,
+                ttl,
+                links=links,
+                on_result=self._record,
+            )
+        except Exception:
+            with self._lock:
+                self.status = "failed"
+                self.error = traceback.format_exc()
+        else:
+            with self._lock:
+                self.status = "finished"
+        finally:
+            with self._lock:
+                self.finished_at = pendulum.now().to_iso8601_string()
+
+    def _record(self, report: dict[str, Any]):
+        with self._lock:
+            key = (report["tablename"], report["item_id"], report["link"])
+            self._reports[key] = report
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("finished", "failed")
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Returns the progress of the job and the reports of the links checked so far.
+
+        Returns:
+            dict[str, Any]: The job progress with its reports ordered by database order.
+        """
+        with self._lock:
+            report = [self._reports[key] for key in self._links if key in self._reports]
+
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "total": len(self._links),
+                "completed": len(report),
+                "report": report,
+            }
+
+
+class LinkInspectionJobs:
+    """
+    Runs link inspection jobs on an in-process worker pool and keeps the most recent ones.
+
+    Only one inspection runs at a time: starting a job while another one is still running
+    returns the running job instead of starting a new crawl.
+    """
+
+    def __init__(self, max_jobs: int = 5):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="link-inspector"
+        )
+        self._jobs: OrderedDict[str, LinkInspectionJob] = OrderedDict()
+        self._max_jobs = max_jobs
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        engine: Engine,
+        max_workers: int = 8,
+        timeout: float = 30,
+        deadline: float = 120,
+        ttl: float = 3600,
+    ) -> LinkInspectionJob:
+        """
+        Starts a new link inspection job unless one is already running.
+
+        Args:
+            engine (Engine): SQLAlchemy Engine instance to connect to the database.
+            max_workers (int): Maximum amount of links checked at the same time.
+            timeout (float): Timeout in seconds of a single link check.
+            deadline (float): Seconds after which links that are still unchecked are reported as timed out.
+            ttl (float): Seconds a cached link status is reused without checking the link again.
+
+        Returns:
+            LinkInspectionJob: The started (or already running) job.
+        """
+        with self._lock:
+            latest = self._latest()
+
+            if latest is not None and not latest.done:
+                return latest
+
+            job = LinkInspectionJob()
+            self._jobs[job.id] = job
+
+            while len(self._jobs) > self._max_jobs:
+                self._jobs.popitem(last=False)
+
+        self._executor.submit(job.run, engine, max_workers, timeout, deadline, ttl)
+        return job
+
+    def get(self, job_id: str) -> Optional[LinkInspectionJob]:
+        """
+        Returns the job with the given id (if it is still kept).
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self) -> Optional[LinkInspectionJob]:
+        """
+        Returns the most recently started job (if any).
+        """
+        with self._lock:
+            return self._latest()
+
+    def _latest(self) -> Optional[LinkInspectionJob]:
+        return next(reversed(self._jobs.values()), None)
+
+
+link_jobs = LinkInspectionJobs()
@@ -0,0 +1,200 @@
+"""
+This module contains utility functions for configuring and monitoring the database connection pool.
+
+Functions:
+- build_engine_options: Builds the SQLAlchemy engine options for the configured pool mode.
+- register_pool_events: Registers the pool event listeners that feed the pool metrics.
+"""
+
+import threading
+from time import perf_counter
+from typing import Any, Mapping
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+
+__all__ = [
+    "InstrumentedQueuePool",
+    "PoolMetrics",
+    "pool_metrics",
+    "build_engine_options",
+    "register_pool_events",
+]
+
+
+class PoolMetrics:
+    """
+    Thread safe counters describing how the database connection pool is being used.
+
+    Attributes:
+        connects (int): Amount of new DBAPI connections opened by the pool.
+        checkouts (int): Amount of connections handed out by the pool.
+        checkins (int): Amount of connections returned to the pool.
+        invalidations (int): Amount of connections invalidated (e.g. failed pre-ping).
+        timeouts (int): Amount of checkouts that gave up waiting for a free connection.
+        waits (int): Amount of checkout waits recorded.
+        total_wait (float): Total seconds spent waiting for a connection to be checked out.
+        max_wait (float): Longest single checkout wait in seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Resets every counter back to zero.
+        """
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        """
+        Records the time a caller spent waiting on the pool for a connection.
+
+        Args:
+            seconds (float): Seconds spent waiting.
+            timed_out (bool): If the wait ended with a pool timeout.
+        """
+        with self._lock:
+            self.waits += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str):
+        """
+        Increments the given counter by one.
+
+        Args:
+            counter (str): Name of the counter attribute to increment.
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        """
+        Returns the current metrics alongside the live state of the given pool.
+
+        Args:
+            pool (Pool): The pool of the engine being monitored.
+
+        Returns:
+            dict[str, Any]: The pool metrics.
+        """
+        with self._lock:
+            metrics = {
+                "pool_class": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    round(self.total_wait / self.waits * 1000, 3) if self.waits else 0.0
+                ),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+        if isinstance(pool, QueuePool):
+            metrics.update(
+                {
+                    "size": pool.size(),
+                    "checked_in": pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": pool.overflow(),
+                }
+            )
+        return metrics
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection in `pool_metrics`.
+    """
+
+    def _do_get(self):
+        start = perf_counter()
+
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_wait(perf_counter() - start, timed_out=True)
+            raise
+
+        pool_metrics.record_wait(perf_counter() - start)
+        return conn
+
+
+def build_engine_options(config: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Builds the SQLAlchemy engine options from the pool settings of the app config.
+
+    The "queue" pool mode keeps a pool of open connections per worker, while the "null"
+    pool mode opens and closes a connection for every checkout (useful for serverless deployments).
+
+    Args:
+        config (Mapping[str, Any]): The app config.
+
+    Returns:
+        dict[str, Any]: The engine options to pass to SQLAlchemy.
+
+    Raises:
+        ValueError: If the configured pool mode is not supported.
+    """
+    mode = config.get("SQLALCHEMY_POOL_MODE", "queue").lower()
+
+    if mode == "null":
+        return {"poolclass": NullPool}
+
+    if mode != "queue":
+        raise ValueError(
+            f'"{mode}" is not a valid pool mode (expected "queue" or "null")'
+        )
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config["SQLALCHEMY_POOL_SIZE"],
+        "max_overflow": config["SQLALCHEMY_POOL_MAX_OVERFLOW"],
+        "pool_timeout": config["SQLALCHEMY_POOL_TIMEOUT"],
+        "pool_recycle": config["SQLALCHEMY_POOL_RECYCLE"],
+        "pool_pre_ping": config["SQLALCHEMY_POOL_PRE_PING"],
+    }
+
+
+def register_pool_events(engine: Engine):
+    """
+    Registers the pool event listeners that keep `pool_metrics` up to date.
+
+    Args:
+        engine (Engine): The engine whose pool should be monitored.
+    """
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_conn, conn_record):
+        pool_metrics.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_conn, conn_record, conn_proxy):
+        pool_metrics.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_conn, conn_record):
+        pool_metrics.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_conn, conn_record, exception):
+        pool_metrics.increment("invalidations")
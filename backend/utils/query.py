@@ -0,0 +1,262 @@
+"""
+This module contains the read-only query executor used by the admin SQL console.
+
+Every query runs as a single statement inside a READ ONLY transaction with a statement timeout,
+so the console can run any SELECT (including JOINs, subqueries and CTEs) but can never write.
+Column labels are taken straight from the result cursor.
+
+Functions:
+- prepare_query: Validates an admin query and normalizes it into a single read-only statement.
+- execute_select: Executes a query and returns its rows.
+- stream_select: Executes a query on a server side cursor and returns an iterator over its rows.
+- explain_select: Returns the EXPLAIN (ANALYZE, BUFFERS) plan of a query.
+"""
+
+import re
+from typing import Any, Iterator, List, Optional, Tuple
+
+import sqlparse
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+__all__ = [
+    "prepare_query",
+    "execute_select",
+    "stream_select",
+    "explain_select",
+]
+
+IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# statements that can start a read-only query
+QUERY_KEYWORDS = ("SELECT", "WITH", "VALUES", "TABLE")
+
+
+def prepare_query(query: str) -> str:
+    """
+    Validates an admin query and normalizes it into a single statement.
+
+    Comments and one trailing ";" are removed, and queries that do not start with a query keyword
+    (e.g. "* FROM admin") are prefixed with SELECT.
+
+    Args:
+        query (str): The SQL query sent by the administrator.
+
+    Returns:
+        str: The normalized query.
+
+    Raises:
+        ValueError: If the query is empty or contains more than one statement.
+    """
+    # statements are split like the server does, so ";" inside a string literal or comment is fine
+    statements = [
+        statement
+        for statement in (
+            sqlparse.format(statement, strip_comments=True).strip()
+            for statement in sqlparse.split(query)
+        )
+        if statement.rstrip(";").strip()
+    ]
+
+    if not statements:
+        raise ValueError("No query was provided")
+
+    # a second statement could end the read only transaction
+    if len(statements) > 1:
+        raise ValueError("Only a single statement can be executed")
+
+    query = statements[0]
+
+    if query.endswith(";"):
+        query = query[:-1].rstrip()
+
+    if query.split(None, 1)[0].upper() not in QUERY_KEYWORDS:
+        query = f"SELECT {query}"
+    return query
+
+
+def _paged_query(
+    query: str,
+    limit: Optional[int] = None,
+    cursor_key: Optional[str] = None,
+    after: Optional[Any] = None,
+) -> Tuple[TextClause, dict[str, Any]]:
+    """internal function that wraps a query with keyset paging and a row limit"""
+    sql = prepare_query(query)
+    params = {}
+
+    if cursor_key is not None:
+        if not IDENTIFIER_RE.match(cursor_key):
+            raise ValueError(f'"{cursor_key}" is not a valid cursor column')
+
+        sql = f"SELECT * FROM ({sql}) AS paged"
+
+        if after is not None:
+            sql += f" WHERE paged.{cursor_key} > :after"
+            params["after"] = after
+
+        sql += f" ORDER BY paged.{cursor_key}"
+
+    if limit is not None:
+        if cursor_key is None:
+            # the query may have a LIMIT of its own
+            sql = f"SELECT * FROM ({sql}) AS limited"
+
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+
+    return text(sql), params
+
+
+def _begin_read_only(conn: Connection | Session, timeout: Optional[int]):
+    """internal function that makes the current transaction read only and limits how long its statements may run"""
+    conn.execute(text("SET TRANSACTION READ ONLY"))
+
+    if timeout:
+        conn.execute(
+            text("SELECT set_config('statement_timeout', :timeout, true)"),
+            {"timeout": str(timeout)},
+        )
+
+
+def execute_select(
+    query: str,
+    engine: Engine,
+    limit: Optional[int] = None,
+    cursor_key: Optional[str] = None,
+    after: Optional[Any] = None,
+    timeout: Optional[int] = None,
+) -> tuple[Any, int]:
+    """
+    Executes a read-only SQL query and returns its rows.
+
+    The column labels of every row are taken from the result cursor, so the query
+    costs a single round trip however many rows it returns.
+
+    Args:
+        query (str): The SQL query to be executed.
+        engine (Engine): The SQLAlchemy engine to use for the database connection.
+        limit (Optional[int]): Maximum amount of rows to return.
+        cursor_key (Optional[str]): Column to order the rows by for keyset paging.
+        after (Optional[Any]): Only return rows whose `cursor_key` is greater than this value.
+        timeout (Optional[int]): Statement timeout in milliseconds.
+
+    Returns:
+        tuple[Any, int]: The rows as a list of dictionaries (or an error message) and the status code.
+    """
+    try:
+        stmt, params = _paged_query(query, limit, cursor_key, after)
+    except ValueError as err:
+        return str(err), 400
+
+    with Session(engine) as session:
+        try:
+            _begin_read_only(session, timeout)
+            res = session.execute(stmt, params)
+            columns = list(res.keys())
+            rows = [dict(zip(columns, row)) for row in res]
+        except DatabaseError as sqlerr:
+            err_msg = sqlerr._message()
+            return (
+                err_msg,
+                400,
+            )
+
+    if rows != []:
+        return (
+            rows,
+            200,
+        )
+    return (
+        "Table exists but is empty",
+        206,
+    )
+
+
+def stream_select(
+    query: str,
+    engine: Engine,
+    limit: Optional[int] = None,
+    cursor_key: Optional[str] = None,
+    after: Optional[Any] = None,
+    timeout: Optional[int] = None,
+    batch_size: int = 500,
+) -> tuple[Iterator[dict[str, Any]] | str, int]:
+    """
+    Executes a read-only SQL query on a server side cursor and returns an iterator over its rows.
+
+    Rows are fetched `batch_size` at a time, so memory stays bounded however many rows the
+    query returns. The connection is held until the iterator is exhausted or closed. If the query
+    fails while it is being streamed, the iterator ends with a {"err_msg": ...} item.
+
+    Args:
+        query (str): The SQL query to be executed.
+        engine (Engine): The SQLAlchemy engine to use for the database connection.
+        limit (Optional[int]): Maximum amount of rows to return.
+        cursor_key (Optional[str]): Column to order the rows by for keyset paging.
+        after (Optional[Any]): Only return rows whose `cursor_key` is greater than this value.
+        timeout (Optional[int]): Statement timeout in milliseconds.
+        batch_size (int): Amount of rows fetched from the cursor at a time.
+
+    Returns:
+        tuple[Iterator[dict[str, Any]] | str, int]: The row iterator (or an error message) and the status code.
+    """
+    try:
+        stmt, params = _paged_query(query, limit, cursor_key, after)
+    except ValueError as err:
+        return str(err), 400
+
+    conn = engine.connect()
+
+    try:
+        conn.begin()
+        _begin_read_only(conn, timeout)
+        res = conn.execution_options(yield_per=batch_size).execute(stmt, params)
+        columns = list(res.keys())
+    except DatabaseError as sqlerr:
+        conn.close()
+        return sqlerr._message(), 400
+
+    def rows():
+        try:
+            for row in res:
+                yield dict(zip(columns, row))
+        except DatabaseError as sqlerr:
+            yield {"err_msg": sqlerr._message()}
+        finally:
+            conn.close()
+
+    return rows(), 200
+
+
+def explain_select(
+    query: str, engine: Engine, timeout: Optional[int] = None
+) -> tuple[List[str] | str, int]:
+    """
+    Runs a read-only SQL query under EXPLAIN (ANALYZE, BUFFERS) and returns its plan.
+
+    The query really is executed by ANALYZE, which is safe as it runs inside a READ ONLY transaction.
+
+    Args:
+        query (str): The SQL query to be explained.
+        engine (Engine): The SQLAlchemy engine to use for the database connection.
+        timeout (Optional[int]): Statement timeout in milliseconds.
+
+    Returns:
+        tuple[List[str] | str, int]: The lines of the query plan (or an error message) and the status code.
+    """
+    try:
+        sql = prepare_query(query)
+    except ValueError as err:
+        return str(err), 400
+
+    with Session(engine) as session:
+        try:
+            _begin_read_only(session, timeout)
+            plan = session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")).scalars()
+            return list(plan), 200
+        except DatabaseError as sqlerr:
+            return sqlerr._message(), 400
@@ -0,0 +1,273 @@
+"""
+This module contains utility functions for rendering blog content (Plate editor trees) on the server.
+
+Functions:
+- render_blog_html: Renders a Plate editor tree into sanitized HTML.
+- render_blog_text: Extracts the plain text of a Plate editor tree.
+- render_excerpt: Builds a short plain text excerpt of a Plate editor tree.
+"""
+
+import re
+from html import escape
+from typing import Any, Iterable, Optional
+from urllib.parse import urlsplit
+
+__all__ = [
+    "render_blog_html",
+    "render_blog_text",
+    "render_excerpt",
+]
+
+# Plate element types rendered as a plain html element
+BLOCK_TAGS = {
+    "p": "p",
+    "h1": "h1",
+    "h2": "h2",
+    "h3": "h3",
+    "h4": "h4",
+    "h5": "h5",
+    "h6": "h6",
+    "blockquote": "blockquote",
+    "ul": "ul",
+    "ol": "ol",
+    "li": "li",
+    "table": "table",
+    "tr": "tr",
+    "td": "td",
+    "th": "th",
+    "toggle": "p",
+    "column_group": "div",
+    "column": "div",
+}
+
+# text marks in the order they are nested (outermost last)
+MARK_TAGS = (
+    ("code", "code"),
+    ("kbd", "kbd"),
+    ("bold", "strong"),
+    ("italic", "em"),
+    ("underline", "u"),
+    ("strikethrough", "s"),
+    ("subscript", "sub"),
+    ("superscript", "sup"),
+    ("highlight", "mark"),
+)
+
+ORDERED_LIST_STYLES = {
+    "decimal",
+    "lower-alpha",
+    "upper-alpha",
+    "lower-roman",
+    "upper-roman",
+}
+ALIGNMENTS = {"left", "center", "right", "justify"}
+COLOR_RE = re.compile(r"^(#[0-9a-fA-F]{3,8}|[a-zA-Z]+|rgba?\([\d\s.,%]+\))$")
+FONT_SIZE_RE = re.compile(r"^\d+(\.\d+)?(px|em|rem|%)$")
+SAFE_SCHEMES = {"", "http", "https", "mailto"}
+
+
+def _safe_url(url: Any, schemes: set[str] = SAFE_SCHEMES) -> Optional[str]:
+    """
+    Returns the url if its scheme is allowed (e.g. no javascript: urls), otherwise None.
+    """
+    if not isinstance(url, str) or not url.strip():
+        return None
+
+    url = url.strip()
+
+    try:
+        scheme = urlsplit(url).scheme.lower()
+    except ValueError:
+        return None
+    return url if scheme in schemes else None
+
+
+def _attr(name: str, value: str) -> str:
+    return f' {name}="{escape(value, quote=True)}"'
+
+
+def _render_leaf(leaf: dict[str, Any]) -> str:
+    html = escape(str(leaf.get("text", "")), quote=False)
+
+    if not html:
+        return ""
+
+    for mark, tag in MARK_TAGS:
+        if leaf.get(mark):
+            html = f"<{tag}>{html}</{tag}>"
+
+    styles = []
+
+    for key, prop in (("color", "color"), ("backgroundColor", "background-color")):
+        if isinstance(leaf.get(key), str) and COLOR_RE.match(leaf[key]):
+            styles.append(f"{prop}: {leaf[key]}")
+
+    if isinstance(leaf.get("fontSize"), str) and FONT_SIZE_RE.match(leaf["fontSize"]):
+        styles.append(f"font-size: {leaf['fontSize']}")
+
+    if styles:
+        html = f'<span{_attr("style", "; ".join(styles))}>{html}</span>'
+    return html
+
+
+def _render_nodes(nodes: Any) -> str:
+    if not isinstance(nodes, list):
+        return ""
+
+    html = []
+    i = 0
+
+    while i < len(nodes):
+        node = nodes[i]
+
+        # indent lists are flat blocks carrying a list style, group the consecutive ones into a list
+        if isinstance(node, dict) and node.get("listStyleType"):
+            style = node["listStyleType"]
+            items = []
+
+            while (
+                i < len(nodes)
+                and isinstance(nodes[i], dict)
+                and nodes[i].get("listStyleType") == style
+            ):
+                items.append(f"<li>{_render_nodes(nodes[i].get('children'))}</li>")
+                i += 1
+
+            tag = "ol" if style in ORDERED_LIST_STYLES else "ul"
+            html.append(f"<{tag}>{''.join(items)}</{tag}>")
+            continue
+
+        html.append(_render_node(node))
+        i += 1
+    return "".join(html)
+
+
+def _render_node(node: Any) -> str:
+    if not isinstance(node, dict):
+        return ""
+
+    if "text" in node and "type" not in node:
+        return _render_leaf(node)
+
+    node_type = node.get("type")
+    children = _render_nodes(node.get("children"))
+
+    if node_type == "a":
+        href = _safe_url(node.get("url"))
+
+        if href is None:
+            return children
+        return f'<a{_attr("href", href)} rel="noopener noreferrer" target="_blank">{children}</a>'
+
+    if node_type == "img":
+        src = _safe_url(node.get("url"), {"", "http", "https"})
+
+        if src is None:
+            return ""
+
+        caption = render_blog_text(node.get("caption") or [])
+        figcaption = (
+            f"<figcaption>{escape(caption, quote=False)}</figcaption>"
+            if caption
+            else ""
+        )
+        return f'<figure><img{_attr("src", src)}{_attr("alt", caption)} loading="lazy">{figcaption}</figure>'
+
+    if node_type == "media_embed":
+        src = _safe_url(node.get("url"), {"http", "https"})
+
+        if src is None:
+            return ""
+        return f'<p><a{_attr("href", src)} rel="noopener noreferrer" target="_blank">{escape(src, quote=False)}</a></p>'
+
+    if node_type == "hr":
+        return "<hr>"
+
+    if node_type == "code_block":
+        lines = [render_blog_text([line]) for line in node.get("children") or []]
+        return f"<pre><code>{escape(chr(10).join(lines), quote=False)}</code></pre>"
+
+    if node_type == "mention":
+        return f'<span class="mention">@{escape(str(node.get("value", "")), quote=False)}</span>'
+
+    if node_type == "lic":
+        return children
+
+    if node_type == "action_item":
+        checked = " checked" if node.get("checked") else ""
+        return f'<p><input type="checkbox" disabled{checked}> {children}</p>'
+
+    if node_type == "table":
+        return f"<table><tbody>{children}</tbody></table>"
+
+    tag = BLOCK_TAGS.get(node_type, "div")
+    align = node.get("align")
+    style = _attr("style", f"text-align: {align}") if align in ALIGNMENTS else ""
+    return f"<{tag}{style}>{children}</{tag}>"
+
+
+def render_blog_html(content: list[dict[str, Any]]) -> str:
+    """
+    Renders a Plate editor tree into HTML.
+
+    Every text is escaped, only known elements are emitted and urls are limited to
+    http(s), mailto and relative urls, so the result can be displayed as is.
+
+    Args:
+        content (list[dict[str, Any]]): The Plate editor tree of the blog post.
+
+    Returns:
+        str: The rendered HTML.
+    """
+    return _render_nodes(content)
+
+
+def _iter_blocks(nodes: Any) -> Iterable[str]:
+    if not isinstance(nodes, list):
+        return
+
+    for node in nodes:
+        if not isinstance(node, dict):
+            continue
+
+        if "text" in node and "type" not in node:
+            yield str(node["text"])
+        elif node.get("type") in ("p", "h1", "h2", "h3", "h4", "h5", "h6", "li"):
+            yield "".join(_iter_blocks(node.get("children"))) + "\n"
+        else:
+            yield from _iter_blocks(node.get("children"))
+
+            if node.get("type") not in ("a", "mention"):
+                yield "\n"
+
+
+def render_blog_text(content: list[dict[str, Any]]) -> str:
+    """
+    Extracts the plain text of a Plate editor tree (one line per block).
+
+    Args:
+        content (list[dict[str, Any]]): The Plate editor tree of the blog post.
+
+    Returns:
+        str: The plain text.
+    """
+    text = "".join(_iter_blocks(content))
+    return re.sub(r"\n{2,}", "\n", text).strip()
+
+
+def render_excerpt(content: list[dict[str, Any]], length: int = 280) -> str:
+    """
+    Builds a plain text excerpt of a Plate editor tree, cut at a word boundary.
+
+    Args:
+        content (list[dict[str, Any]]): The Plate editor tree of the blog post.
+        length (int): Maximum amount of characters of the excerpt.
+
+    Returns:
+        str: The excerpt.
+    """
+    text = " ".join(render_blog_text(content).split())
+
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
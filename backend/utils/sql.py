@@ -2,24 +2,41 @@
 This module contains utility functions related to SQL operations needed in setup of application.
 """
 
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from html import escape
+import threading
 from math import ceil
-from typing import Any, List
+from typing import Any, List, Optional, Sequence, Tuple
 
-import traceback
-import requests
-import certifi
-from sqlalchemy import func, inspect, select, text
+from sqlalchemy import event, func, inspect, select, Select, text, tuple_
 from sqlalchemy.engine import Engine
-from sqlalchemy.exc import DatabaseError
-from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.orm import DeclarativeBase, InstrumentedAttribute, load_only, Session
 
 __all__ = [
     "SQLAlchemyBase",
+    "get_table_columns",
+    "invalidate_schema_cache",
     "showcase_has_data",
+    "encode_cursor",
+    "decode_cursor",
+    "keyset_select",
+    "keyset_paginate",
+    "get_row_count",
+    "bump_row_count",
+    "seed_row_counts",
+    "blog_counter",
+    "get_total_project_posts",
     "get_total_project_pages",
+    "paginate_project_posts_select",
     "paginate_project_posts",
     "get_total_blog_posts",
+    "show_blog_posts_select",
     "show_blog_posts",
+    "search_posts",
+    "get_skill_facets",
 ]
 
 
@@ -34,165 +51,49 @@ class SQLAlchemyBase(DeclarativeBase):
     pass
 
 
-def _sql_row_to_dict(
-    engine: Engine, obj: tuple[Any, Any], tablename: str, not_star: None | List[str]
-):
-    if not_star:
-        return {key: val for key, val in zip(not_star, obj)}
+_schema_cache: dict[Tuple[str, str], List[dict[str, Any]]] = {}
+_schema_cache_lock = threading.Lock()
 
-    columns = inspect(engine).get_columns(tablename)
 
-    return {key["name"]: val for key, val in zip(columns, obj)}
-
-
-def _get_table_with_url_columns(engine: Engine):
-    """internal function table columns for all tables with a column or more containing urls"""
-    inspector = inspect(engine)
-    for tablename in ["cert_and_license", "course", "education", "project_post"]:
-        yield (
-            inspector.get_columns(tablename),
-            tablename,
-        )
-
-
-def inspect_links(engine: Engine) -> List[dict[str, Any]]:
+def get_table_columns(engine: Engine, tablename: str) -> List[dict[str, Any]]:
     """
-    Inspects links in the database tables and returns their validity and status.
-    Args:
-        engine (Engine): SQLAlchemy Engine instance to connect to the database.
-    Returns:
-        List[dict[str, Any]]: A list of dictionaries containing the following keys:
-            - item_id (str): The ID of the item.
-            - link (str): The URL link.
-            - validity (bool): True if the link is valid (HTTP status code starts with '2'), False otherwise.
-            - http_code (int): The HTTP status code returned by the HEAD request.
-            - highlight (str): The highlight color based on the HTTP status code.
-    """
-    results = []
-
-    for table, table_name in _get_table_with_url_columns(engine):
-        if len(table) == 0:
-            continue
-
-        for column in table:
-            if column["name"].find("url") == -1:
-                continue
-
-            with Session(engine) as session:
-
-                column_res = session.execute(
-                    text(
-                        f"SELECT id, {column['name']} FROM {table_name} WHERE {column['name']} IS NOT NULL"
-                    )
-                ).fetchall()
-
-                for row in column_res:
-                    url = row[1]
-
-                    try:
-                        res = requests.head(url, timeout=30, verify=certifi.where())
-                    except requests.exceptions.Timeout:
-                        results.append(
-                            {
-                                "tablename": table_name,
-                                "item_id": row[0],
-                                "link": url,
-                                "validity": False,
-                                "http_code": 500,
-                            }
-                        )
-                        continue
-                    except requests.exceptions.SSLError as e:
-                        # append error message
-                        results.append(
-                            {
-                                "tablename": table_name,
-                                "item_id": row[0],
-                                "link": url,
-                                "validity": f"""SSLError has occurred. Please check CA version on Render else could be something different. 
-                                                \n Error traceback dump: \n\n
-                                                {traceback.format_exc()}""",
-                                "http_code": 503,
-                            }
-                        )
-
-                    if not res.ok:
-                        if "Server" in res.headers:
-                            if "AkamaiGHost" in res.headers["Server"]:
-                                validity = (
-                                    "Validity check failed due to AkamaiGHost blocking"
-                                )
-
-                            if (
-                                "CF-RAY" in res.headers
-                                and "cloudflare" in res.headers["Server"]
-                            ):
-                                validity = (
-                                    "Validity check failed due to CloudFlare blocking"
-                                )
-                            else:
-                                validity = (
-                                    "Validity check failed due to unknown firewall"
-                                )
-                        else:
-                            validity = False
-                    else:
-                        validity = str(res.status_code).startswith("2")
-
-                    results.append(
-                        {
-                            "tablename": table_name,
-                            "item_id": row[0],
-                            "link": url,
-                            "validity": validity,
-                            "http_code": res.status_code,
-                        }
-                    )
-
-    return results
-
-
-def execute_select(query: str, engine: Engine) -> tuple[Any, int]:
-    """
-    Executes a SELECT SQL query and returns the scalar result.
+    Returns the reflected columns of a table, reflecting the table only once per process.
+
+    The cache is cleared by `invalidate_schema_cache` when create_all and drop_all run in the same process.
+    Migrations run in their own process, so the app workers must be restarted after migrating.
 
     Args:
-        query (str): The SQL query to be executed.
         engine (Engine): The SQLAlchemy engine to use for the database connection.
+        tablename (str): Name of the table to reflect.
 
     Returns:
-        Any: The scalar result of the executed query.
+        List[dict[str, Any]]: The reflected columns, as returned by `Inspector.get_columns`.
     """
-    not_star = None
+    key = (engine.url.render_as_string(), tablename)
 
-    with Session(engine) as session:
-        try:
-            res = session.execute(text(f"SELECT {query}")).fetchall()
-            rows = [tuple(row) for row in res]
-            table = query.split("FROM")[1].split("WHERE")[0].strip()
-        except DatabaseError as sqlerr:
-            err_msg = sqlerr._message()
-            return (
-                err_msg,
-                400,
-            )
+    with _schema_cache_lock:
+        columns = _schema_cache.get(key)
 
-    if rows != []:
-        columns = query.split("FROM")[0].strip()
+    if columns is None:
+        columns = inspect(engine).get_columns(tablename)
 
-        if columns != "*":
-            not_star = columns.split(",")
+        with _schema_cache_lock:
+            _schema_cache[key] = columns
+    return columns
 
-        for i, row in enumerate(rows):
-            rows[i] = _sql_row_to_dict(engine, row, table, not_star)
-        return (
-            rows,
-            200,
-        )
-    return (
-        "Table exists but is empty",
-        206,
-    )
+
+def invalidate_schema_cache(*args, **kwargs):
+    """
+    Clears the reflected schema cache used by `get_table_columns`.
+
+    Accepts and ignores any arguments so it can be used directly as a DDL event listener.
+    """
+    with _schema_cache_lock:
+        _schema_cache.clear()
+
+
+event.listen(SQLAlchemyBase.metadata, "after_create", invalidate_schema_cache)
+event.listen(SQLAlchemyBase.metadata, "after_drop", invalidate_schema_cache)
 
 
 def showcase_has_data(engine: Engine) -> bool:
@@ -217,83 +118,520 @@ def showcase_has_data(engine: Engine) -> bool:
     return True
 
 
-def get_total_project_pages(engine: Engine) -> int:
+def encode_cursor(values: List[Any]) -> str:
     """
-    Calculate the total number of pages based on the count of all results in the project_post modal.
+    Encodes the key values of a row into an opaque pagination cursor.
 
     Args:
-        engine: The SQLAlchemy engine used to connect to the database.
+        values (List[Any]): The key values of the row.
 
     Returns:
-        The total number of pages in the project_post modal.
+        str: The url safe cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def _coerce_cursor_value(key: InstrumentedAttribute, value: Any) -> Any:
+    """
+    internal function that converts a decoded cursor value to the python type of its key column
+
+    Raises a ValueError if the value does not fit the column.
+    """
+    try:
+        python_type = key.type.python_type
+    except NotImplementedError:
+        python_type = None
+
+    if python_type is bool and isinstance(value, bool):
+        return value
+
+    if python_type is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+
+    if python_type is str and isinstance(value, str):
+        return value
+
+    # dates are stored as their isoformat (datetime is a subclass of date, so it is checked first)
+    for date_type in (datetime, date):
+        if python_type is date_type and isinstance(value, str):
+            try:
+                return date_type.fromisoformat(value)
+            except ValueError:
+                break
+
+    raise ValueError("Invalid cursor")
+
+
+def decode_cursor(
+    cursor: str, keys: Optional[Sequence[InstrumentedAttribute]] = None
+) -> List[Any]:
+    """
+    Decodes a pagination cursor made by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor to decode.
+        keys (Optional[Sequence[InstrumentedAttribute]]): The columns the cursor was made for. If given,
+        the cursor must hold one value per column and each value is converted to the type of its column.
+
+    Returns:
+        List[Any]: The key values stored in the cursor.
+
+    Raises:
+        ValueError: If the cursor is not a valid cursor.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as err:
+        raise ValueError("Invalid cursor") from err
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+
+    if keys is None:
+        return values
+
+    if len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+    return [_coerce_cursor_value(key, value) for key, value in zip(keys, values)]
+
+
+def keyset_select(
+    stmt: Select,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    page_size: int = 4,
+    descending: bool = False,
+) -> Select:
+    """
+    Builds the select of a keyset page (see `keyset_paginate`), with one extra row to tell if there are more.
+
+    Args:
+        stmt (Select): The select statement of the model to paginate.
+        keys (Sequence[InstrumentedAttribute]): The columns the rows are ordered by.
+        cursor (Optional[str]): Cursor of the page boundary to start from (the first page if omitted).
+        direction (str): "next" for the page after the cursor, "prev" for the page before it.
+        page_size (int): Amount of rows per page.
+        descending (bool): If the rows are ordered from the highest key to the lowest.
 
+    Returns:
+        Select: The select of the page.
+
+    Raises:
+        ValueError: If the direction or cursor is invalid.
+    """
+    if direction not in ("next", "prev"):
+        raise ValueError(f'"{direction}" is not a valid direction')
+
+    ascending = (direction == "next") != descending
+    key_tuple = tuple_(*keys)
+
+    if cursor is not None:
+        values = tuple_(*decode_cursor(cursor, keys))
+        stmt = stmt.where(key_tuple > values if ascending else key_tuple < values)
+
+    return stmt.order_by(
+        *[key.asc() if ascending else key.desc() for key in keys]
+    ).limit(page_size + 1)
+
+
+def keyset_paginate(
+    engine: Engine,
+    stmt: Select,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    page_size: int = 4,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str], Optional[str]]:
     """
+    Paginates a select statement with keyset (cursor) pagination.
+
+    Rows are ordered by `keys`, which should be unique together and covered by an index,
+    so every page is an index range scan no matter how deep it is.
+
+    Args:
+        engine (Engine): The database engine to use for the query.
+        stmt (Select): The select statement of the model to paginate.
+        keys (Sequence[InstrumentedAttribute]): The columns the rows are ordered by.
+        cursor (Optional[str]): Cursor of the page boundary to start from (the first page if omitted).
+        direction (str): "next" for the page after the cursor, "prev" for the page before it.
+        page_size (int): Amount of rows per page.
+        descending (bool): If the rows are ordered from the highest key to the lowest.
+
+    Returns:
+        Tuple[List[Any], Optional[str], Optional[str]]: The rows of the page, the cursor of the next page
+        and the cursor of the previous page (None when there is no such page).
+
+    Raises:
+        ValueError: If the direction or cursor is invalid.
+    """
+    stmt = keyset_select(stmt, keys, cursor, direction, page_size, descending)
+
     with Session(engine) as session:
-        total_count = session.execute(
-            select(func.count().label("project_total_count")).select_from(
-                text("project_post")
+        rows = list(session.execute(stmt).scalars())
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if direction == "prev":
+        rows.reverse()
+
+    if not rows:
+        return [], None, None
+
+    first = encode_cursor([getattr(rows[0], key.key) for key in keys])
+    last = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+    if direction == "next":
+        return rows, last if has_more else None, first if cursor is not None else None
+    return rows, last, first if has_more else None
+
+
+# counters maintained in the row_counter table: name -> (table, filter)
+ROW_COUNTERS = {
+    "project_post": ("project_post", "TRUE"),
+    "blog_post:published": ("blog_post", "is_draft = false"),
+    "blog_post:draft": ("blog_post", "is_draft = true"),
+}
+
+
+def _count_rows_sql(name: str) -> str:
+    """
+    internal function that returns a select of the real row count of a maintained counter
+    """
+    tablename, where = ROW_COUNTERS[name]
+    return f"SELECT :name, count(*) FROM {tablename} WHERE {where}"
+
+
+def seed_row_counts(engine: Engine):
+    """
+    Seeds the maintained row counts that do not exist yet from real counts.
+
+    Existing counters are left as they are, so starting another worker never resets
+    a counter that running workers are bumping.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine used to connect to the database.
+    """
+    with Session(engine) as session:
+        for name in ROW_COUNTERS:
+            session.execute(
+                text(
+                    f"INSERT INTO row_counter (name, count) {_count_rows_sql(name)} "
+                    "ON CONFLICT (name) DO NOTHING"
+                ),
+                {"name": name},
             )
+        session.commit()
+
+
+def get_row_count(engine: Engine, name: str) -> int:
+    """
+    Retrieves a maintained row count from the row_counter table.
+
+    The counters are seeded on startup (see `seed_row_counts`) and kept up to date by
+    `bump_row_count` in the same transaction as every add and delete.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine used to connect to the database.
+        name (str): Name of the counter (one of `ROW_COUNTERS`).
+
+    Returns:
+        int: The row count.
+    """
+    with Session(engine) as session:
+        count = session.execute(
+            text("SELECT count FROM row_counter WHERE name = :name"), {"name": name}
         ).scalar()
 
-    calc = ceil(total_count / 4)  # ceil(count of all results in modal / page size))
+    if count is None:
+        seed_row_counts(engine)
+        return get_row_count(engine, name)
+    return count
+
+
+def bump_row_count(session: Session, name: str, delta: int):
+    """
+    Adds `delta` to a maintained row count as part of the caller's transaction.
+
+    A missing counter is seeded from a real count inside the same transaction (which already
+    includes the caller's own rows), so a write never gets lost while the counter is created.
+
+    Args:
+        session (Session): The session of the transaction adding or deleting rows.
+        name (str): Name of the counter (one of `ROW_COUNTERS`).
+        delta (int): Amount of rows added (positive) or deleted (negative).
+    """
+    # the pending rows must be in the real count a missing counter is seeded from
+    session.flush()
+    session.execute(
+        text(
+            f"INSERT INTO row_counter (name, count) {_count_rows_sql(name)} "
+            "ON CONFLICT (name) DO UPDATE SET count = row_counter.count + :delta"
+        ),
+        {"delta": delta, "name": name},
+    )
+
+
+def blog_counter(is_draft: bool) -> str:
+    """
+    Returns the name of the row counter tracking blog posts with the given draft state.
+
+    Args:
+        is_draft (bool): If the blog posts are drafts.
 
-    return calc
+    Returns:
+        str: The name of the counter.
+    """
+    return "blog_post:draft" if is_draft else "blog_post:published"
+
+
+def get_total_project_posts(engine: Engine) -> int:
+    """
+    Retrieves the total number of project posts from the maintained row counter.
+
+    Args:
+        engine: The SQLAlchemy engine used to connect to the database.
+
+    Returns:
+        The total number of project posts.
+    """
+    return get_row_count(engine, "project_post")
+
+
+def get_total_project_pages(engine: Engine, page_size: int = 4) -> int:
+    """
+    Calculate the total number of pages based on the count of all results in the project_post modal.
+
+    Args:
+        engine: The SQLAlchemy engine used to connect to the database.
+        page_size: The number of project posts per page.
+
+    Returns:
+        The total number of pages in the project_post modal.
+
+    """
+    return ceil(get_total_project_posts(engine) / page_size)
+
+
+def paginate_project_posts_select(model, page: int, page_size: int = 4) -> Select:
+    """
+    Builds the select of a page of project posts (see `paginate_project_posts`).
+
+    Args:
+        model: The model to query for project posts.
+        page: The page number to retrieve.
+        page_size: The number of project posts per page.
+
+    Returns:
+        The select of the page.
+    """
+    return (
+        select(model).order_by(model.id).offset((page - 1) * page_size).limit(page_size)
+    )
 
 
-def paginate_project_posts(model, engine: Engine, page: int) -> List[Any]:
+def paginate_project_posts(
+    model, engine: Engine, page: int, page_size: int = 4
+) -> List[Any]:
     """
     Paginates project posts based on the given model, engine, and page number.
 
+    Kept for page number based clients; new clients should use `keyset_paginate`.
+
     Args:
         model: The model to query for project posts.
         engine: The database engine to use for the query.
         page: The page number to retrieve.
+        page_size: The number of project posts per page.
 
     Returns:
         A list of project posts for the specified page.
     """
-    page_offset = (
-        page - 1
-    ) * 4  # 4: The number of project posts per page (e.g. page_size)
-
     with Session(engine) as session:
-        query = session.query(model).offset(page_offset).limit(4)
-        res = query.all()
-
-    return res
+        res = session.execute(
+            paginate_project_posts_select(model, page, page_size)
+        ).scalars()
+        return res.all()
 
 
-def get_total_blog_posts(engine: Engine) -> int:
+def get_total_blog_posts(engine: Engine, is_draft: bool = False) -> int:
     """
-    Retrieves the total number of blog posts from the database.
+    Retrieves the total number of published (or draft) blog posts from the maintained row counter.
     Parameters:
     - engine (Engine): The SQLAlchemy engine used to connect to the database.
+    - is_draft (bool): Count draft blog posts instead of published ones.
     Returns:
     - int: The total number of blog posts.
     """
-    with Session(engine) as session:
-        total_blogs = session.execute(
-            select(func.count().label("blog_total_count")).select_from(
-                text("blog_post")
-            )
-        ).scalar()
-    return total_blogs
+    return get_row_count(engine, blog_counter(is_draft))
+
+
+def show_blog_posts_select(
+    model, total_pages: int, fields: Optional[Sequence[str]] = None
+) -> Select:
+    """
+    Builds the select of the newest published blog posts (see `show_blog_posts`).
 
+    Args:
+        model: The model to query for blog posts.
+        total_pages: Total pages to show
+        fields: Only load these columns of the blog posts (every column if omitted)
 
-def show_blog_posts(model, engine: Engine, total_pages: int) -> List[Any]:
+    Returns:
+        The select of the blog posts.
     """
-    Query's a limit to amount of blog posts shown.
+    stmt = select(model).filter_by(is_draft=False)
+
+    if fields:
+        stmt = stmt.options(load_only(*[getattr(model, f) for f in fields]))
+
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(total_pages)
+
+
+def show_blog_posts(
+    model, engine: Engine, total_pages: int, fields: Optional[Sequence[str]] = None
+) -> List[Any]:
+    """
+    Query's a limit to amount of blog posts shown, newest first.
 
     Args:
         model: The model to query for project posts.
         engine: The database engine to use for the query.
         total_pages: Total pages to show
+        fields: Only load these columns of the blog posts (every column if omitted)
 
     Returns:
         A list of blog posts for the specified limit
     """
     with Session(engine) as session:
-        query = session.query(model).filter_by(is_draft=False).limit(total_pages)
-        res = query.all()
+        res = session.execute(
+            show_blog_posts_select(model, total_pages, fields)
+        ).scalars()
+        return res.all()
 
-    return res
+
+def get_skill_facets(
+    engine: Engine, skills: Sequence[str] = ()
+) -> List[dict[str, Any]]:
+    """
+    Counts the projects per skill, among the projects having every one of the given skills.
+
+    The counts only read the project_skill join table through its (skill_id, project_id) index.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine used to connect to the database.
+        skills (Sequence[str]): Slugs of the skills the projects are filtered by.
+
+    Returns:
+        List[dict[str, Any]]: The name, slug and project count of every skill used by the matching
+        projects, most used first.
+    """
+    matched = (
+        "JOIN (SELECT ps.project_id FROM project_skill ps JOIN skill s ON s.id = ps.skill_id "
+        "WHERE s.slug = ANY(:skills) GROUP BY ps.project_id HAVING count(*) = :amount) m "
+        "ON m.project_id = ps.project_id "
+        if skills
+        else ""
+    )
+    stmt = text(
+        "SELECT s.name, s.slug, count(*) AS count FROM project_skill ps "
+        f"{matched}JOIN skill s ON s.id = ps.skill_id "
+        "GROUP BY s.id ORDER BY count DESC, s.name"
+    )
+
+    with Session(engine) as session:
+        rows = session.execute(
+            stmt, {"skills": list(skills), "amount": len(skills)}
+        ).all()
+
+    return [{"name": row.name, "slug": row.slug, "count": row.count} for row in rows]
+
+
+# searchable tables: kind -> select of the matching rows of the query (q.query)
+SEARCH_SOURCES = {
+    "blog": (
+        "SELECT 'blog' AS kind, b.id, b.title, ts_rank_cd(b.search_vector, q.query) AS rank, "
+        "concat_ws(' ', b.\"desc\", b.content_text) AS document "
+        "FROM blog_post b, q WHERE b.is_draft = false AND b.search_vector @@ q.query"
+    ),
+    "project": (
+        "SELECT 'project' AS kind, p.id, p.name AS title, ts_rank_cd(p.search_vector, q.query) AS rank, "
+        "concat_ws(' ', p.\"desc\", p.skills) AS document "
+        "FROM project_post p, q WHERE p.search_vector @@ q.query"
+    ),
+}
+
+# highlight markers, swapped for <mark> tags once the headline is escaped
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+
+
+def search_posts(
+    engine: Engine,
+    query: str,
+    kinds: Sequence[str] = ("blog", "project"),
+    page: int = 1,
+    page_size: int = 10,
+) -> Tuple[List[dict[str, Any]], int]:
+    """
+    Searches the published blog posts and project posts with Postgres full text search.
+
+    Rows are matched on their (GIN indexed) search_vector column with the web search syntax
+    (quoted phrases, "or" and -exclusions) and ranked by ts_rank_cd. The highlighted headline
+    is only built for the rows of the requested page.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine used to connect to the database.
+        query (str): The search query.
+        kinds (Sequence[str]): The kinds of posts to search (any of `SEARCH_SOURCES`).
+        page (int): The page number to retrieve.
+        page_size (int): The number of results per page.
+
+    Returns:
+        Tuple[List[dict[str, Any]], int]: The results of the page (kind, id, title, rank and an HTML safe
+        headline with the matches wrapped in <mark> tags) and the total amount of results.
+    """
+    hits = " UNION ALL ".join(SEARCH_SOURCES[kind] for kind in kinds)
+    stmt = text(
+        "WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query), "
+        f"hits AS ({hits}), "
+        "total AS (SELECT count(*) AS total FROM hits), "
+        "page AS (SELECT * FROM hits ORDER BY rank DESC, kind, id LIMIT :limit OFFSET :offset) "
+        "SELECT page.kind, page.id, page.title, page.rank, total.total, "
+        "ts_headline('english', page.document, q.query, :options) AS headline "
+        # the total row is kept when the page is empty (e.g. a page past the last one)
+        "FROM total CROSS JOIN q LEFT JOIN page ON TRUE "
+        "ORDER BY page.rank DESC, page.kind, page.id"
+    )
+    options = (
+        f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+        "MaxWords=35, MinWords=15, MaxFragments=2"
+    )
+
+    with Session(engine) as session:
+        rows = session.execute(
+            stmt,
+            {
+                "query": query,
+                "limit": page_size,
+                "offset": (page - 1) * page_size,
+                "options": options,
+            },
+        ).all()
+
+    results = [
+        {
+            "type": row.kind,
+            "id": row.id,
+            "title": row.title,
+            "rank": round(row.rank, 6),
+            "headline": escape(row.headline)
+            .replace(HIGHLIGHT_START, "<mark>")
+            .replace(HIGHLIGHT_STOP, "</mark>"),
+        }
+        for row in rows
+        if row.id is not None
+    ]
+    return results, rows[0].total
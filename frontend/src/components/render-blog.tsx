@@ -1,3 +1,4 @@
+import { parseEditorContent } from '@/utils';
 import { useTextEditor } from '@/utils/plate/editor';
 import { CommentProvider } from '@udecode/plate-comments/react';
 import { Plate } from '@udecode/plate-common/react';
@@ -7,7 +8,7 @@ import { Editor } from '@/components/plate-ui/editor';
 
 const BlogViewer: React.FC<BlogViewerProps> = ({ content }) => {
 	const editor = useTextEditor();
-	editor.children = JSON.parse(content);
+	editor.children = parseEditorContent(content);
 
 	if (!content) {
 		return null;
@@ -10,8 +10,9 @@ import Header from '@/components/Header';
 import NavBar from '@/components/NavBar';
 
 const BlogPosts: React.FC = () => {
-	const [content, setContent] = useState<BlogList[] | null>(null);
-	const [blogLimit, setBlogLimit] = useState(5);
+	const [content, setContent] = useState<DraftBlogList[] | null>(null);
+	const [cursor, setCursor] = useState<string | null>(null);
+	const [nextCursor, setNextCursor] = useState<string | null>(null);
 	const [blogCount, setBlogCount] = useState(null);
 	const [cookies] = useCookies(['user']);
 
@@ -19,17 +20,22 @@ const BlogPosts: React.FC = () => {
 		axios
 			.get('/api/blog', {
 				params: {
-					tp: blogLimit,
+					cursor: cursor ?? undefined,
 				},
 			})
 			.then((res: AxiosResponse) => {
-				setContent(res.data?.blogs);
-				setBlogCount(res.data?.blog_count);
+				const blogs: DraftBlogList[] = res.data?.blogs ?? [];
+
+				setContent((prev) =>
+					cursor && prev ? [...prev, ...blogs] : blogs
+				);
+				setNextCursor(res.data?.next_cursor ?? null);
+				setBlogCount(res.data?.blog_count ?? null);
 			})
 			.catch((err: AxiosError) => {
 				console.error(err.response?.data);
 			});
-	}, [blogLimit]);
+	}, [cursor]);
 
 	return (
 		<>
@@ -80,13 +86,12 @@ const BlogPosts: React.FC = () => {
 								);
 							})
 						: null}
-					{blogCount !== null &&
-					(blogLimit === blogCount || blogCount < blogLimit) ? (
+					{blogCount !== null && nextCursor === null ? (
 						<>
 							<Button
 								className="max-w-prose md:translate-x-10"
 								color="gray"
-								onClick={() => setBlogLimit(5)}
+								onClick={() => setCursor(null)}
 								outline
 								pill
 								size="md">
@@ -98,7 +103,7 @@ const BlogPosts: React.FC = () => {
 							<Button
 								className="max-w-prose md:translate-x-10"
 								gradientMonochrome="cyan"
-								onClick={() => setBlogLimit((l) => l + 5)}
+								onClick={() => setCursor(nextCursor)}
 								pill
 								size="md">
 								More
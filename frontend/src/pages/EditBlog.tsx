@@ -1,4 +1,8 @@
-import { SetFormErrors, serializeEditorContent } from '@/utils';
+import {
+	SetFormErrors,
+	parseEditorContent,
+	serializeEditorContent,
+} from '@/utils';
 import useAuthToken from '@/utils/hooks/use-auth-token';
 import { useTextEditor } from '@/utils/plate/editor';
 import axios, { type AxiosError, type AxiosResponse } from 'axios';
@@ -62,7 +66,7 @@ const EditBlog: React.FC = () => {
 				console.log('content type: ', typeof res.data.content);
 				console.log('content: ', res.data.content);
 
-				const content = JSON.parse(res.data.content);
+				const content = parseEditorContent(res.data.content);
 
 				console.log('type of content after parse: ', typeof content);
 				console.log('content after parse: ', content);
@@ -73,6 +73,8 @@ const Education: React.FC = () => {
 								if (awards !== 'N/A') {
 									awards = JSON.parse(awards);
 								}
+							} else if (awards.length === 0) {
+								awards = 'N/A';
 							}
 
 							// get courses
@@ -34,19 +34,35 @@ const Projects: React.FC = () => {
 			project_url: '',
 		});
 	const [currentPage, setCurrentPage] = useState(1);
+	const [pageRequest, setPageRequest] = useState<{
+		cursor?: string;
+		direction?: 'next' | 'prev';
+	}>({});
+	const [nextCursor, setNextCursor] = useState<string | null>(null);
+	const [prevCursor, setPrevCursor] = useState<string | null>(null);
 	const [cookies] = useCookies(['user']);
 	const navigate = useNavigate();
 	const BearerToken = useAuthToken();
 
-	const onPageChange = (page: number) => setCurrentPage(page);
+	const onPageChange = (page: number) => {
+		if (page > currentPage && nextCursor) {
+			setPageRequest({ cursor: nextCursor, direction: 'next' });
+		} else if (page < currentPage && prevCursor) {
+			setPageRequest({ cursor: prevCursor, direction: 'prev' });
+		} else {
+			return;
+		}
+		setCurrentPage(page);
+	};
 
 	useEffect(() => {
 		axios
 			.get('/api/projects', {
-				params: { page: currentPage },
+				params: pageRequest,
 			})
 			.then((res: AxiosResponse) => {
-				const parsed_data = res.data?.map((entry: ProjectProps) => ({
+				const projects: ProjectProps[] = res.data?.projects ?? [];
+				const parsed_data = projects.map((entry: ProjectProps) => ({
 					...entry,
 					skills:
 						typeof entry.skills === 'string'
@@ -54,24 +70,15 @@ const Projects: React.FC = () => {
 							: entry.skills.map((val) => val.trim()),
 				}));
 				setProjects(parsed_data);
+				setNextCursor(res.data?.next_cursor ?? null);
+				setPrevCursor(res.data?.prev_cursor ?? null);
+				setTotalPages(res.data?.total_pages ?? 0);
 			})
 			.catch((err: AxiosError) => {
 				console.error(err.response?.data);
 				toast.error(JSON.stringify(err.response?.data));
 			});
-	}, [currentPage]);
-
-	useEffect(() => {
-		axios
-			.get('/api/projects/totalpages')
-			.then((res: AxiosResponse) => {
-				setTotalPages(res.data?.payload);
-			})
-			.catch((err: AxiosError) => {
-				console.error(err.response?.data);
-				toast.error(JSON.stringify(err.response?.data));
-			});
-	}, []);
+	}, [pageRequest]);
 
 	const handleProjectEdit = (e: React.MouseEvent, formInfo: ProjectProps) => {
 		e.preventDefault();
@@ -240,7 +247,7 @@ const Projects: React.FC = () => {
 					<div className="flex overflow-x-auto sm:justify-center">
 						<Pagination
 							currentPage={currentPage}
-							layout="pagination"
+							layout="navigation"
 							onPageChange={onPageChange}
 							showIcons
 							totalPages={totalPages}
@@ -95,7 +95,14 @@ const ViewBlog: React.FC = () => {
 			<NavBar />
 			<br />
 			<div className="container mx-auto max-w-64 select-none md:max-w-lg lg:max-w-2xl xl:max-w-5xl">
-				{blog?.content ? <BlogViewer content={blog?.content} /> : null}
+				{blog?.content_html ? (
+					<div
+						className="whitespace-pre-wrap break-words bg-newspaper bg-repeat px-6 py-2 font-cormorant-garamond shadow-2xl shadow-gray-900 grayscale sepia"
+						dangerouslySetInnerHTML={{ __html: blog.content_html }}
+					/>
+				) : blog?.content ? (
+					<BlogViewer content={blog?.content} />
+				) : null}
 			</div>
 			{cookies.user ? (
 				<div className="py-10 max-sm:flex max-sm:flex-row max-sm:justify-center max-sm:gap-x-8 md:py-0">
@@ -211,7 +211,9 @@ declare global {
 	// contents and blog viewer
 	interface BlogList {
 		author: string;
-		content: string;
+		content: string | object[];
+		content_html?: string;
+		excerpt?: string;
 		created_at: string;
 		id: number;
 		desc: string;
@@ -220,7 +222,7 @@ declare global {
 	}
 
 	interface BlogViewerProps {
-		content: string;
+		content: string | object[];
 	}
 
 	// utils
@@ -82,3 +82,13 @@ export const serializeEditorContent = (content: object) => {
 		return '';
 	}
 };
+
+/**
+ * Parses blog content into editor content.
+ *
+ * @param content - The blog content. It can be the editor content itself or a JSON string of it (older responses).
+ * @returns The editor content.
+ */
+export const parseEditorContent = (content: string | object[]) => {
+	return typeof content === 'string' ? JSON.parse(content) : content;
+};